@@ -1,13 +1,10 @@
 import sys
-from time import sleep
+from time import perf_counter
 import random
-import pygame
-import pandas as pd
-from pygame.sprite import Sprite
-import joblib  # For saving/loading models
-from sklearn.ensemble import RandomForestRegressor
 import os
-
+import threading
+import numpy as np
+import pygame
 
 from settings import Settings
 from game_stats import GameStats
@@ -15,28 +12,148 @@ from scoreboard import Scoreboard
 from button import Button
 from ship import Ship
 from bullet import Bullet
-from alien import Alien
+from sprite_pool import SpritePool, PooledSprite
+from fleet import Fleet
+from collision import CollisionSystem
+from assets import AssetCache
+from audio import AudioManager
+from renderer import DirtyRenderer, ScaledRenderer
+from metrics_sink import MetricsSink
+from metrics_store import MetricsStore, METRIC_COLUMNS
+from difficulty_worker import DifficultyWorker
+from difficulty_service import DifficultyClient
+from model_watcher import ModelWatcher, load_difficulty_model
+from profiler import FrameProfiler, NULL_PROFILER
+from replay import InputRecorder
+from scheduler import Scheduler
+
+# Phases of a frame, in the order the profiler times them.
+PROFILE_PHASES = ('events', 'timers', 'ship', 'bullets', 'aliens', 'difficulty',
+                  'powerups', 'metrics', 'screen')
 
 
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
-        """Initialize the game, and create game resources."""
+    def __init__(self, settings=None, headless=False, seed=None, recording=None):
+        """Initialize the game, and create game resources.
+
+        recording is a replay.Recording to play back instead of asking the model.
+        """
+        # Headless games use SDL's dummy drivers and never draw to the screen.
+        self.headless = headless
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+        # Every random choice comes from generators seeded here, so a seed and
+        # the player's inputs are enough to replay a session.
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.random = random.Random(self.seed)
+
+        # Milliseconds spent in each startup phase.
+        self.startup = {}
+        start = perf_counter()
+
         pygame.init()
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
-        self.model = joblib.load('difficulty_model.pkl')  # Load the trained model here
+        self.settings = settings if settings is not None else Settings()
+
+        # The model loads in the background after the window is up. Until then
+        # no predictions are made and the alien speed stays at its setting.
+        self.model = None
+        self.model_version = None
+        self.model_ready = threading.Event()
+        self.model_watcher = None
+
+        # Count of simulated frames, used as the game's clock.
+        self.frames = 0
+
+        # The main loop's fixed-timestep state: time not yet simulated, when it
+        # last checked the clock, and how far between steps sprites are drawn.
+        self._lag = 0.0
+        self._last_time = perf_counter()
+        self._blend = 1.0
+        self.loop_stats = {'steps': 0, 'frames_drawn': 0, 'dropped_steps': 0}
+
+        # Inputs seen during the current tick of the game loop, for the recorder.
+        self.recording = recording
+        self.recorder = None
+        record_path = os.environ.get('ALIEN_RECORD') or self.settings.record_path
+        if record_path and recording is None:
+            self.settings.record_path = record_path
+            self.recorder = InputRecorder(self.seed, self.settings)
+        self._tick_fires = 0
+        self._tick_play = False
+
+        # Per-phase frame timings; the null profiler costs nothing while it's off.
+        profile_mode = os.environ.get('ALIEN_PROFILE', '')
+        self.frame_profiler = FrameProfiler(PROFILE_PHASES, budget_ms=1000 / self.settings.fps,
+                                            window=self.settings.profile_window)
+        self.profiler = self.frame_profiler if profile_mode else NULL_PROFILER
+        self._next_profiler = None  # Swapped in when the next frame begins, not mid-frame
+        self.show_profile = profile_mode == 'overlay'
+
+        # Frame on which the player was last given something new to react to.
+        self._stimulus_frame = None
+
+        # Timed events run on game time, which only passes while a game is played.
+        self.timers = Scheduler(self.settings.fps)
+        self.respawning = False  # The game holds still for a moment after a hit
+        self._powerup_timers = {}  # Power-up type -> the timer that ends it
+
+        # Predictions run on a worker thread; the game loop only reads results.
+        # With a difficulty service running, the service predicts for this game
+        # and the worker only takes over if the service goes away.
+        self.difficulty_worker = DifficultyWorker(self.model)
+        if self.settings.difficulty_service and recording is None:
+            try:
+                self.difficulty_worker = DifficultyClient(
+                    self.settings.difficulty_service, self.difficulty_worker,
+                    on_lost=self._difficulty_service_lost,
+                    timeout=self.settings.difficulty_service_timeout)
+            except OSError as e:
+                print(f"No difficulty service, predicting locally: {e}")
+        self._difficulty_version = 0
+        self._difficulty_event = False
+
+        # Metrics are buffered in memory and written by a background thread,
+        # either to a CSV file or, as one session of binary records, to a MetricsStore.
+        # The game's timers ask for the periodic writes, so the sink has no interval of its own.
+        columns, writer = METRIC_COLUMNS, None
+        if self.settings.metrics_format == 'binary':
+            store = MetricsStore(self.settings.metrics_path)
+            self.metrics_session = store.new_session()
+            columns = ('frame',) + METRIC_COLUMNS
+            writer = lambda rows: store.append_rows(rows, self.metrics_session)
+        self.metrics_sink = MetricsSink(
+            self.settings.metrics_path, columns,
+            buffer_size=self.settings.metrics_buffer_size,
+            batch_size=self.settings.metrics_batch_size,
+            flush_interval=None,
+            writer=writer)
 
         self.screen = pygame.display.set_mode(
             (self.settings.screen_width, self.settings.screen_height))
         pygame.display.set_caption("Alien Invasion")
+        start = self._startup_phase('display', start)
+
+        self._model_loader = None
+        if recording is None and not isinstance(self.difficulty_worker, DifficultyClient):
+            self._start_model_loader()
+        else:
+            self.model_ready.set()  # Replays use the recorded predictions, clients the service
 
-        # Load sound effects
-        self.laser_sound = pygame.mixer.Sound('laser.wav')
-        self.explosion_sound = pygame.mixer.Sound('explosion.wav')
-        self.powerup_sound = pygame.mixer.Sound('powerup.wav')
+        # Images and sounds are loaded and converted once, then shared.
+        self.assets = AssetCache()
+        if self.settings.preload_assets:
+            self.assets.preload()
+        start = self._startup_phase('assets', start)
+
+        # Sound effects play through a fixed set of mixer channels; headless games are silent.
+        self.audio = AudioManager(self.assets, muted=headless or self.settings.audio_muted,
+                                  steal_after=self.settings.audio_steal_after)
 
         # Create an instance to store game statistics and a scoreboard.
         self.stats = GameStats(self)
@@ -44,8 +161,12 @@ class AlienInvasion:
 
         self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        # Bullets and power-ups are recycled rather than built during play.
+        self.bullet_pool = SpritePool(lambda: Bullet(self), self.settings.bullets_allowed)
+        self.aliens = Fleet(self, seed=self.seed)  # The fleet lives in NumPy arrays
         self.powerups = pygame.sprite.Group()  # Initialize powerups group
+        self.powerup_pool = SpritePool(lambda: PowerUp(self), self.settings.powerups_reserved)
+        self.collisions = CollisionSystem(self.settings.collision_cell_size)
 
         self._create_fleet()
 
@@ -55,42 +176,233 @@ class AlienInvasion:
         # Make the Play button.
         self.play_button = Button(self, "Play")
 
+        # Redraws only the parts of the screen that changed, in 'dirty' mode. The
+        # other render profiles draw the playfield at a lower internal resolution.
+        if self.settings.render_profile == 'native':
+            self.renderer = DirtyRenderer(self)
+        else:
+            self.renderer = ScaledRenderer(self, self.settings.render_profile)
+        self._startup_phase('objects', start)
+
+    def _startup_phase(self, name, start):
+        """Record how long a startup phase took and return the time it ended."""
+        now = perf_counter()
+        self.startup[name] = (now - start) * 1000
+        return now
+
+    def _start_model_loader(self):
+        """Load the difficulty model on a background thread."""
+        self._model_loader = threading.Thread(target=self._load_model_in_background,
+                                              name="model-loader", daemon=True)
+        self._model_loader.start()
+
+    def _difficulty_service_lost(self):
+        """Fall back to predicting locally; runs on the client's thread."""
+        print("Lost the difficulty service, predicting locally.")
+        self._start_model_loader()
+
+    def _load_model_in_background(self):
+        """Load the difficulty model, then watch for newly published versions."""
+        start = perf_counter()
+        try:
+            self._swap_model(*load_difficulty_model(self.settings))
+        except (OSError, ValueError) as e:
+            print(f"Difficulty model not loaded, keeping the default alien speed: {e}")
+        finally:
+            self._startup_phase('model', start)
+            self.model_ready.set()
+
+        # Models published while the game runs are loaded in the background and swapped in,
+        # including the first one if there wasn't one to load at startup.
+        if self.settings.model_poll_interval:
+            self.model_watcher = ModelWatcher(self.settings.models_dir, self._swap_model,
+                                              self.settings.model_poll_interval,
+                                              self.model_version)
+
+    def _swap_model(self, model, version):
+        """Start predicting with a newly published model; runs on the watcher thread."""
+        self.difficulty_worker.set_model(model)
+        self.model = model
+        self.model_version = version
 
     def update_difficulty(self):
         """Adjust the game difficulty based on player performance."""
-        if len(self.stats.reaction_times) > 0:
-            reaction_time = self.stats.reaction_times[-1]
-            accuracy = self.stats.shots_hit / self.stats.shots_fired if self.stats.shots_fired > 0 else 0
-            lives_lost = self.stats.lives_lost
-
-            # Use the model to predict the new alien speed based on player metrics
-            predicted_alien_speed = self.model.predict([[reaction_time, accuracy, lives_lost]])[0]
+        if self.recording is not None:
+            # Apply the prediction the recorded session applied on this frame.
+            speed = self.recording.speeds.get(self.frames)
+            if speed is not None:
+                self.settings.alien_speed = speed
+            return
+
+        # Apply the newest finished prediction, if there is one we haven't used.
+        predicted_alien_speed, version = self.difficulty_worker.latest()
+        if version != self._difficulty_version:
+            self._difficulty_version = version
+            if predicted_alien_speed is None:
+                return  # A fallback worker that hasn't predicted yet
             self.settings.alien_speed = predicted_alien_speed
+            if self.recorder is not None:
+                self.recorder.record_speed(self.frames, predicted_alien_speed)
+
+        # Ask for a new prediction when the difficulty timer or a game event asked
+        # for one, so headless runs see the same cadence as real ones.
+        if self._difficulty_event:
+            features = self.stats.difficulty_features()
+            if features is not None and self.difficulty_worker.ready:
+                self.difficulty_worker.submit(features)
+                self._difficulty_event = False
+
+    def request_difficulty_update(self):
+        """Ask for a prediction on the next frame."""
+        self._difficulty_event = True
+
+    def _schedule_game_timers(self):
+        """Start the timers that run for the whole of a game."""
+        self.timers.clear()
+        self._powerup_timers.clear()
+        self.respawning = False
+        self.timers.call_every(1 / self.settings.difficulty_update_hz,
+                               self.request_difficulty_update)
+        self.timers.call_every(self.settings.metrics_flush_interval,
+                               self.metrics_sink.request_flush)
 
     def run_game(self):
-        """Start the main loop for the game."""
+        """Start the main loop for the game.
+
+        The game logic advances in fixed steps of 1/fps seconds whatever the
+        frame rate. After a slow frame several steps run before the next one
+        is drawn; after a fast one none may run, and sprites are drawn part of
+        the way between their last two steps.
+        """
+        step = 1 / self.settings.fps
+        self._last_time = perf_counter()
         while True:
+            self._begin_frame()
+            now = perf_counter()
+            self._lag += now - self._last_time
+            self._last_time = now
             self._check_events()
-
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-                self.update_difficulty()  # Adjust difficulty in real-time
-                self._update_powerups()  # Update power-ups
-
-                # Save metrics periodically
-                self.save_metrics()
+            self.profiler.lap('events')
+
+            steps = 0
+            while self._lag >= step:
+                if steps == self.settings.max_steps_per_frame:
+                    # Too far behind to catch up: drop the backlog and slow down
+                    # instead of spending ever longer frames catching up.
+                    self.loop_stats['dropped_steps'] += int(self._lag / step)
+                    self._lag = 0.0
+                    break
+                self._step()
+                self._lag -= step
+                steps += 1
+            self.loop_stats['steps'] += steps
+            self._blend = min(self._lag / step, 1.0) if self.settings.interpolate else 1.0
 
             self._update_screen()
-            self.clock.tick(60)
+            self.loop_stats['frames_drawn'] += 1
+            self.profiler.lap('screen')
+            self.profiler.end_frame()
+
+            if self.show_profile:
+                pygame.display.update(self.frame_profiler.draw(self.screen))
+            self.clock.tick(self.settings.render_fps)
+
+    def run_headless(self, bot, max_frames=None, max_episodes=None):
+        """Play games with a bot as fast as possible and return run statistics."""
+        episodes = 0
+        scores = []
+        start_frames = self.frames
+        # Bots play with everything warmed up from the first frame.
+        self.model_ready.wait()
+        self.metrics_sink.ready.wait()
+        start = perf_counter()
+
+        self._start_game()
+        while max_frames is None or self.frames - start_frames < max_frames:
+            self._begin_frame()
+            move, fire = bot.act(self)
+            self._apply_action(move, fire)
+            self.profiler.lap('events')
+            self._step()
+            self.profiler.end_frame()
+
+            if not self.game_active:
+                # Game over: record the episode and start another one.
+                episodes += 1
+                scores.append(self.stats.score)
+                if max_episodes is not None and episodes >= max_episodes:
+                    break
+                self._start_game()
+
+        elapsed = perf_counter() - start
+        frames = self.frames - start_frames
+        return {
+            'frames': frames,
+            'episodes': episodes,
+            'seconds': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'scores': scores,
+        }
+
+    def replay_tick(self, move_left, move_right, fires, play):
+        """Run one tick of the game loop with recorded inputs instead of events."""
+        if play and not self.game_active:
+            self._start_game()
+        self.ship.moving_left = bool(move_left)
+        self.ship.moving_right = bool(move_right)
+        for _ in range(fires):
+            self._fire_bullet()
+        self._step()
+
+    def _step(self):
+        """Advance the game logic by one fixed step, without drawing anything."""
+        if self.game_active:
+            self.timers.advance()
+            self.profiler.lap('timers')
+            if not self.respawning:
+                self._update_game()
+        self._end_tick()
+        self.audio.end_frame()
+
+    def _end_tick(self):
+        """Record the tick's inputs and resulting state, then start a new tick."""
+        if self.recorder is not None:
+            self.recorder.record_tick(self, self.ship.moving_left, self.ship.moving_right,
+                                      self._tick_fires, self._tick_play)
+        self._tick_fires = 0
+        self._tick_play = False
+
+    def _update_game(self):
+        """Advance the game by one frame."""
+        self.frames += 1
+        profiler = self.profiler
+        self.ship.update()
+        profiler.lap('ship')
+        self._update_bullets()
+        profiler.lap('bullets')
+        self._update_aliens()
+        profiler.lap('aliens')
+        self.update_difficulty()  # Adjust difficulty in real-time
+        profiler.lap('difficulty')
+        self._update_powerups()  # Update power-ups
+        profiler.lap('powerups')
+
+        # Save metrics periodically
+        self.save_metrics()
+        profiler.lap('metrics')
+
+    def _apply_action(self, move, fire):
+        """Steer the ship left (-1), right (1) or not at all (0), and maybe fire."""
+        self.ship.moving_left = move < 0
+        self.ship.moving_right = move > 0
+        if fire:
+            self._fire_bullet()
 
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self._quit_game()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
@@ -99,6 +411,25 @@ class AlienInvasion:
                 mouse_pos = pygame.mouse.get_pos()
                 self._check_play_button(mouse_pos)
 
+    def close(self):
+        """Write any buffered metrics and stop the background workers."""
+        self.metrics_sink.close()
+        self.difficulty_worker.close()
+        if self._model_loader is not None:
+            self._model_loader.join()
+        if self.model_watcher is not None:
+            self.model_watcher.close()
+        if self.frame_profiler.frames:
+            self.frame_profiler.dump(self.settings.profile_path)
+        if self.recorder is not None:
+            self.recorder.save(self.settings.record_path)
+
+    def _quit_game(self):
+        """Write any buffered metrics and exit the game."""
+        self.close()
+        pygame.quit()
+        sys.exit()
+
     def _reset_game_elements(self):
         """Reset the game elements after the ship is hit."""
         self.bullets.empty()
@@ -106,24 +437,41 @@ class AlienInvasion:
         self.powerups.empty()  # Clear power-ups as well
         self._create_fleet()
         self.ship.center_ship()
-        sleep(0.5)
+
+        # Hold everything still for a moment, without blocking the main loop.
+        self.respawning = True
+        self.timers.call_later(self.settings.respawn_delay, self._end_respawn)
+
+    def _end_respawn(self):
+        """Let the game carry on after the pause that follows a hit."""
+        self.respawning = False
+        self._stimulus_frame = self.frames  # Reaction times start once the fleet moves
 
     def _check_play_button(self, mouse_pos):
         """Start a new game when the player clicks Play."""
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         if button_clicked and not self.game_active:
-            self.settings.initialize_dynamic_settings()
-            self.stats.reset_stats()
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            self.game_active = True
-            self.bullets.empty()
-            self.aliens.empty()
-            self.powerups.empty()
-            self._create_fleet()
-            self.ship.center_ship()
-            pygame.mouse.set_visible(False)
+            self._start_game()
+
+    def _start_game(self):
+        """Reset the statistics and the fleet, and start a new game."""
+        # Anything fired earlier in this tick is cleared away, so a replay only
+        # needs the shots that come after the click.
+        self._tick_play = True
+        self._tick_fires = 0
+        self.settings.initialize_dynamic_settings()
+        self.stats.reset_stats()
+        self.sb.prep_score()
+        self.sb.prep_level()
+        self.sb.prep_ships()
+        self._schedule_game_timers()
+        self.game_active = True
+        self.bullets.empty()
+        self.aliens.empty()
+        self.powerups.empty()
+        self._create_fleet()
+        self.ship.center_ship()
+        pygame.mouse.set_visible(False)
 
     def _check_keydown_events(self, event):
         """Respond to keypresses."""
@@ -132,10 +480,38 @@ class AlienInvasion:
         elif event.key == pygame.K_LEFT:
             self.ship.moving_left = True
         elif event.key == pygame.K_q:
-            pygame.quit()
-            sys.exit()
+            self._quit_game()
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
+        elif event.key == pygame.K_F3:
+            self._toggle_profiler()
+        elif event.key == pygame.K_F4:
+            self._toggle_profile_overlay()
+
+    def _begin_frame(self):
+        """Switch profilers if one was asked for, then start timing the frame."""
+        if self._next_profiler is not None:
+            self.profiler, self._next_profiler = self._next_profiler, None
+        self.profiler.begin_frame()
+
+    def _toggle_profiler(self):
+        """Turn frame profiling on or off from the next frame."""
+        profiler = self.profiler if self._next_profiler is None else self._next_profiler
+        if profiler.enabled:
+            self._next_profiler = NULL_PROFILER
+            if self.show_profile:
+                self._toggle_profile_overlay()
+        else:
+            self._next_profiler = self.frame_profiler
+
+    def _toggle_profile_overlay(self):
+        """Show or hide the profiler's timing table, profiling while it's shown."""
+        self.show_profile = not self.show_profile
+        if self.show_profile:
+            self._next_profiler = self.frame_profiler
+        else:
+            # Repaint the area the table covered.
+            self.renderer.invalidate()
 
     def _check_keyup_events(self, event):
         """Respond to key releases."""
@@ -146,33 +522,46 @@ class AlienInvasion:
 
     def _fire_bullet(self):
         """Create a new bullet and add it to the bullets group."""
+        self._tick_fires += 1
+        if self.respawning:
+            return
         if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
+            new_bullet = self.bullet_pool.acquire()
             self.bullets.add(new_bullet)
-            self.laser_sound.play()  # Play laser sound when firing
+            self.audio.play('laser')  # Play laser sound when firing
+            new_bullet.shot = self.stats.record_shot()
+            self._record_reaction_time()
+
+    def _record_reaction_time(self):
+        """Record the time from the latest new fleet or hit to this shot."""
+        if self._stimulus_frame is not None:
+            frames = self.frames - self._stimulus_frame
+            self.stats.record_reaction(frames / self.settings.fps)
+            self._stimulus_frame = None
 
     def _update_bullets(self):
         """Update position of bullets and get rid of old bullets."""
-        self.bullets.update()
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        self.bullets.update()  # Bullets remove themselves once off screen
 
         self._check_bullet_alien_collisions()
 
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions."""
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        collisions = self.collisions.bullets_vs_fleet(self.bullets, self.aliens)
 
         if collisions:
+            for bullet in collisions:
+                self.stats.record_hit(bullet.shot)
+            self._stimulus_frame = self.frames
             for aliens in collisions.values():
                 self.stats.score += self.settings.alien_points * len(aliens)
-                self.explosion_sound.play()  # Play explosion sound
+                self.audio.play('explosion')  # Several in one frame play once
             self.sb.prep_score()
             self.sb.check_high_score()
+            self.request_difficulty_update()
 
             # Chance to spawn a power-up
-            if random.random() < 0.2:  # 20% chance to spawn
+            if self.random.random() < 0.2:  # 20% chance to spawn
                 self._create_powerup()
 
         if not self.aliens:
@@ -184,29 +573,47 @@ class AlienInvasion:
 
     def _create_powerup(self):
         """Create a power-up at a random position."""
-        powerup = PowerUp(self)  # Assuming PowerUp class is defined
+        powerup = self.powerup_pool.acquire()
         self.powerups.add(powerup)
 
     def _update_powerups(self):
         """Update and check for power-up collisions."""
-        self.powerups.update()
-        for powerup in self.powerups.copy():
-            if powerup.rect.top > self.settings.screen_height:
-                self.powerups.remove(powerup)
-            if pygame.sprite.spritecollideany(self.ship, self.powerups):
-                self.powerup_sound.play()
-                self.stats.shots_fired += 1  # Example power-up effect
-                self.powerups.remove(powerup)
+        self.powerups.update()  # Power-ups remove themselves once off screen
+        collected = self.collisions.ship_vs_group(self.ship.rect, self.powerups, dokill=True)
+        for powerup in collected:
+            self.audio.play('powerup')
+            self.stats.powerups_collected += 1
+            self._start_powerup(powerup.kind)
+
+    def _start_powerup(self, kind):
+        """Apply a power-up to the ship for powerup_duration seconds of game time.
+
+        Collecting one that's already active makes it last longer instead of stacking.
+        """
+        timer = self._powerup_timers.get(kind)
+        if timer is None:
+            self.ship.apply_powerup(kind)
+        else:
+            self.timers.cancel(timer)
+        self._powerup_timers[kind] = self.timers.call_later(
+            self.settings.powerup_duration, self._end_powerup, kind)
+
+    def _end_powerup(self, kind):
+        """Undo a power-up whose time is up."""
+        del self._powerup_timers[kind]
+        self.ship.remove_powerup(kind)
 
     def _ship_hit(self):
         """Respond to the ship being hit by an alien."""
         if self.stats.ships_left > 0:
             self.stats.ships_left -= 1
-            self.stats.lives_lost += 1  # Increment lives lost
+            self.stats.record_life_lost(self.frames)
             self.sb.prep_ships()
+            self.request_difficulty_update()
             self._reset_game_elements()
         else:
             self.save_metrics()  # Save metrics when the game ends
+            self.metrics_sink.request_flush()
             self.game_active = False
             pygame.mouse.set_visible(True)
 
@@ -215,82 +622,64 @@ class AlienInvasion:
         self._check_fleet_edges()
         self.aliens.update()
 
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.collisions.ship_vs_fleet(self.ship.rect, self.aliens):
             self._ship_hit()
 
         self._check_aliens_bottom()
 
     def _check_aliens_bottom(self):
         """Check if any aliens have reached the bottom of the screen."""
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                self._ship_hit()
-                break
+        if self.aliens.reached_bottom(self.settings.screen_height):
+            self._ship_hit()
 
     def _create_fleet(self):
         """Create the fleet of aliens with dynamic speed."""
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-
-            current_x = alien_width
-            current_y += 2 * alien_height
-
-    def _create_alien(self, x_position, y_position):
-        """Create an alien and place it in the fleet."""
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        new_alien.alien_speed = random.uniform(0.5, 2.0)  # Assign random speed
-        self.aliens.add(new_alien)
+        self._stimulus_frame = self.frames
+        alien_width, alien_height = self.aliens.width, self.aliens.height
+
+        # Fill rows of aliens, one alien width apart, leaving room at the bottom.
+        columns = np.arange(alien_width, self.settings.screen_width - 2 * alien_width,
+                            2 * alien_width)
+        rows = np.arange(alien_height, self.settings.screen_height - 3 * alien_height,
+                         2 * alien_height)
+        xs, ys = np.meshgrid(columns, rows)
+        self.aliens.spawn(xs.ravel(), ys.ravel())
 
     def _check_fleet_edges(self):
         """Respond appropriately if any aliens have reached an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         """Drop the entire fleet and change the fleet's direction."""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         self.settings.fleet_direction *= -1
 
     def save_metrics(self):
-        """Collect and save game metrics to a CSV file."""
-        accuracy = [self.stats.shots_hit / self.stats.shots_fired if self.stats.shots_fired > 0 else 0]
-        lives_lost = [self.stats.lives_lost]
-
-        # Ensure all lists are of the same length
-        max_length = max(len(self.stats.reaction_times), len(accuracy), len(lives_lost))
-        reaction_times = self.stats.reaction_times + [None] * (max_length - len(self.stats.reaction_times))
-        accuracy = accuracy + [None] * (max_length - len(accuracy))
-        lives_lost = lives_lost + [None] * (max_length - len(lives_lost))
-
-        metrics_data = {
-            'reaction_time': reaction_times,
-            'accuracy': accuracy,
-            'lives_lost': lives_lost,
-        }
-
-        df = pd.DataFrame(metrics_data)
-        df.to_csv('player_metrics.csv', mode='a', header=not os.path.exists('player_metrics.csv'), index=False)
+        """Collect game metrics and queue them for the metrics file."""
+        # One row per frame, with the alien speed the player was facing as the
+        # target for train_model.py. The sink writes in batches off the frame loop.
+        # The features come from the rolling statistics, the same ones predictions use.
+        row = self.stats.metric_features() + (self.settings.alien_speed,)
+        if self.metrics_sink.writer is not None:
+            row = (self.frames,) + row  # Binary records are indexed by frame
+        self.metrics_sink.record(row)
 
 
     def _update_screen(self):
         """Update images on the screen, and flip to the new screen."""
+        if self.settings.render_mode == 'dirty' or self.settings.render_profile != 'native':
+            self.renderer.draw()
+            return
+
+        # Full redraw: the fallback when dirty rectangles are turned off.
+        self._draw_frame()
+        pygame.display.flip()
+
+    def _draw_frame(self):
+        """Draw the whole frame and return the rects of the moving sprites."""
         self.screen.fill(self.settings.bg_color)
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        self.ship.blitme()
-        self.aliens.draw(self.screen)
+        rects = self._draw_sprites()
 
         # Draw the score information.
         self.sb.show_score()
@@ -298,25 +687,43 @@ class AlienInvasion:
         # Draw the play button if the game is inactive.
         if not self.game_active:
             self.play_button.draw_button()
+        return rects
 
-        pygame.display.flip()
+    def _draw_sprites(self, surface=None):
+        """Draw the bullets, ship and aliens, and return the rects they cover.
+
+        surface, if given, is drawn to instead of the screen.
+        """
+        # The fraction of a step that moving sprites are drawn behind where they are.
+        behind = 1.0 - self._blend if self.game_active else 0.0
+        surface = self.screen if surface is None else surface
+        rects = [bullet.draw_bullet(behind, surface) for bullet in self.bullets.sprites()]
+        rects.append(self.ship.blitme(behind, surface))
+        rects.extend(self.aliens.draw(surface, behind))
+        return rects
 
 
 # Power-up class
-class PowerUp(Sprite):
+class PowerUp(PooledSprite):
     """A class to represent a power-up in the game."""
 
+    kind = 'speed'  # The effect Ship.apply_powerup gives when it's collected
+
     def __init__(self, ai_game):
         """Initialize the power-up."""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
-        self.image = pygame.image.load('pup.png')  # Load your power-up image
-        self.rect = self.image.get_rect()
+        self.random = ai_game.random
+        # Shared power-up image; the file is nearly screen-sized, so scale it down
+        self.image = ai_game.assets.image('pup.png', (30, 30))
+        self.rect = self.image.get_rect()  # Placed by reset() when the pool hands it out
 
+    def reset(self):
+        """Move the power-up to a new random position."""
         # Start each new power-up at a random position near the top of the screen
-        self.rect.x = random.randint(0, self.settings.screen_width - self.rect.width)
-        self.rect.y = random.randint(50, 150)  # Adjust the height as needed
+        self.rect.x = self.random.randint(0, self.settings.screen_width - self.rect.width)
+        self.rect.y = self.random.randint(50, 150)  # Adjust the height as needed
 
     def update(self):
         """Move the power-up down the screen."""
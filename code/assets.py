@@ -0,0 +1,114 @@
+import os
+import time
+
+import pygame
+
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Everything the game uses, as (file name, scaled size or None).
+IMAGES = [
+    ('alien.png', (50, 50)),
+    ('ship.bmp', (60, 50)),
+    ('pup.png', (30, 30)),
+]
+SOUNDS = ['laser.wav', 'explosion.wav', 'powerup.wav']
+
+
+class AssetCache:
+    """A class to load, scale and convert each image and sound once, and share it."""
+
+    def __init__(self, search_dirs=None):
+        """Initialize empty caches and the directories searched for asset files."""
+        # The working directory first, then the code and assets folders.
+        self.search_dirs = search_dirs or [
+            '', _CODE_DIR, os.path.join(os.path.dirname(_CODE_DIR), 'assets')]
+        self._images = {}
+        self._surfaces = {}
+        self._sounds = {}
+        self._stats = {}
+
+    def path(self, name):
+        """Return the path of the first asset file called name."""
+        for directory in self.search_dirs:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"Asset not found: {name}")
+
+    def image(self, name, size=None):
+        """Return the shared surface for an image, scaled to size if given."""
+        key = (name, size)
+        surface = self._images.get(key)
+        if surface is None:
+            start = time.perf_counter()
+            surface = pygame.image.load(self.path(name))
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            surface = self._convert(surface)
+            self._images[key] = surface
+            self._record(key, start, surface.get_width() * surface.get_height()
+                         * surface.get_bytesize())
+        return surface
+
+    def surface(self, size, color):
+        """Return a shared surface of the given size filled with color."""
+        key = (tuple(size), tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self._convert(pygame.Surface(size))
+            surface.fill(color)
+            self._surfaces[key] = surface
+        return surface
+
+    def sound(self, name):
+        """Return the shared Sound for a sound file."""
+        sound = self._sounds.get(name)
+        if sound is None:
+            start = time.perf_counter()
+            sound = pygame.mixer.Sound(self.path(name))
+            self._sounds[name] = sound
+            self._record((name, None), start, sound.get_length() * self._bytes_per_second())
+        return sound
+
+    def preload(self, images=IMAGES, sounds=SOUNDS):
+        """Load every listed asset now, so nothing touches the disk during play."""
+        for name, size in images:
+            self.image(name, size)
+        for name in sounds:
+            self.sound(name)
+
+    def report(self):
+        """Return one dictionary per loaded asset with its load time and memory."""
+        return [
+            {'asset': name if size is None else f"{name} {size[0]}x{size[1]}",
+             'load_ms': load_ms, 'bytes': int(size_bytes)}
+            for (name, size), (load_ms, size_bytes) in self._stats.items()
+        ]
+
+    def _convert(self, surface):
+        """Match the display's pixel format so blits take the fast path."""
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def _record(self, key, start, size_bytes):
+        """Remember how long an asset took to load and how much memory it uses."""
+        self._stats[key] = ((time.perf_counter() - start) * 1000, size_bytes)
+
+    def _bytes_per_second(self):
+        """Return the mixer's bytes of audio per second."""
+        frequency, size, channels = pygame.mixer.get_init()
+        return frequency * abs(size) // 8 * channels
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1000, 700))
+    assets = AssetCache()
+    assets.preload()
+    for row in assets.report():
+        print(f"{row['asset']:<24} {row['load_ms']:>8.2f} ms {row['bytes'] / 1024:>9.1f} KiB")
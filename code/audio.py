@@ -0,0 +1,121 @@
+import pygame
+
+# Sound effects by category: (file, channels reserved for it, priority).
+SOUND_CATEGORIES = {
+    'laser': ('laser.wav', 2, 1),
+    'explosion': ('explosion.wav', 3, 2),
+    'powerup': ('powerup.wav', 1, 3),
+}
+
+
+class AudioManager:
+    """A class to play sound effects through a fixed pool of mixer channels.
+
+    Sounds asked for during a frame are played together at the end of it, and
+    asking for the same sound twice in a frame plays it once. Each category
+    gets its own channels. When they're all busy, a new sound plays on an idle
+    channel of a lower priority category, or takes over the category's oldest
+    voice, or failing that the oldest voice of a lower priority category. Only voices that have played for at least steal_after
+    frames are taken over, so a burst of sounds can't keep cutting each
+    other off; with none of those, the new sound is dropped.
+    """
+
+    def __init__(self, assets, categories=SOUND_CATEGORIES, muted=False, steal_after=6):
+        """Load each category's sound and reserve its channels, unless muted."""
+        self.categories = categories
+        self.steal_after = steal_after
+        self.muted = muted or not pygame.mixer.get_init()
+        self._priority = {name: priority for name, (_, _, priority) in categories.items()}
+
+        # Sounds asked for this frame.
+        self._pending = {}
+        self._frame = 0
+
+        # Counters per category: sounds asked for, repeats within a frame,
+        # sounds played, voices taken over, and sounds with no voice to play on.
+        self.counters = {name: dict.fromkeys(('triggers', 'coalesced', 'plays', 'steals',
+                                              'drops'), 0)
+                         for name in categories}
+
+        self._sounds = {}
+        self._channels = {}
+        self._voices = []  # [category, frame started] per channel, by channel id
+        if self.muted:
+            return
+        total = sum(channels for _, channels, _ in categories.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)  # Sound.play() elsewhere can't take these
+        first = 0
+        for name, (file_name, channels, _) in categories.items():
+            self._sounds[name] = assets.sound(file_name)
+            self._channels[name] = [(i, pygame.mixer.Channel(i))
+                                    for i in range(first, first + channels)]
+            self._voices.extend([None, 0] for _ in range(channels))
+            first += channels
+
+    def play(self, category):
+        """Ask for a sound to play at the end of this frame."""
+        counters = self.counters[category]
+        counters['triggers'] += 1
+        if category in self._pending:
+            counters['coalesced'] += 1
+        else:
+            self._pending[category] = True
+
+    def end_frame(self):
+        """Play the sounds asked for this frame, the highest priority first."""
+        self._frame += 1
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        if self.muted:
+            return
+        for category in sorted(pending, key=self._priority.get, reverse=True):
+            found = self._voice_for(category)
+            counters = self.counters[category]
+            if found is None:
+                counters['drops'] += 1
+                continue
+            channel_id, channel, stolen = found
+            if stolen:
+                counters['steals'] += 1
+            channel.play(self._sounds[category])
+            self._voices[channel_id][:] = [category, self._frame]
+            counters['plays'] += 1
+
+    def _voice_for(self, category):
+        """Return (channel id, channel, stealing?) to play a category on, or None."""
+        for channel_id, channel in self._channels[category]:
+            if not channel.get_busy():
+                return channel_id, channel, False
+
+        # Use an idle channel of a lower priority category, or else take over an
+        # old-enough voice: the category's own oldest first, then the oldest of
+        # the lowest priority below it.
+        priority = self._priority[category]
+        best = None
+        for other, channels in self._channels.items():
+            if other != category and self._priority[other] >= priority:
+                continue
+            for channel_id, channel in channels:
+                if not channel.get_busy():
+                    return channel_id, channel, False  # Idle, or has never played
+                playing, started = self._voices[channel_id]
+                # A channel can be playing a more important sound that took it over.
+                if self._priority[playing] > priority or self._frame - started < self.steal_after:
+                    continue
+                key = (playing != category, self._priority[playing], started)
+                if best is None or key < best[0]:
+                    best = (key, channel_id, channel)
+        if best is None:
+            return None
+        return best[1], best[2], True
+
+    def report(self):
+        """Return the counters per category, plus totals."""
+        report = {name: dict(counters) for name, counters in self.counters.items()}
+        report['total'] = {key: sum(counters[key] for counters in self.counters.values())
+                           for key in ('triggers', 'coalesced', 'plays', 'steals', 'drops')}
+        report['muted'] = self.muted
+        return report
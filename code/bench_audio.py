@@ -0,0 +1,180 @@
+"""Compare playing sound effects directly with playing them through AudioManager.
+
+First records which sounds a dense headless game asks for on every frame: many
+bullets, a bot that fires whenever it can. Then plays that trace back in real
+time on SDL's dummy audio driver, which mixes like a sound card would without
+making any noise, in two ways:
+
+- direct: Sound.play() for every request, as the game used to
+- managed: through AudioManager's channel pools
+
+For each it reports sound requests, sounds played and dropped, the most voices
+playing at once and the time spent starting sounds. It also checks that a
+power-up sound takes over a lower-priority voice when every channel is busy,
+and that an explosion with its own channels busy plays on a laser channel
+that has never been used. Exits with status 1 if the manager ever plays more
+voices than it reserved, or drops either of those sounds.
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from assets import AssetCache
+from audio import AudioManager, SOUND_CATEGORIES
+from bots import TrackerBot
+from settings import Settings
+
+
+def record_trace(frames, bullets, seed):
+    """Return the list of sound categories requested on each frame of a headless game."""
+    settings = Settings()
+    settings.bullets_allowed = bullets
+    settings.metrics_path = os.devnull
+    ai = AlienInvasion(settings=settings, headless=True, seed=seed)
+    bot = TrackerBot(seed=seed, fire_chance=1.0)
+    trace = []
+    ai.audio.play = lambda category: trace[-1].append(category)
+    ai._start_game()
+    for _ in range(frames):
+        trace.append([])
+        ai._apply_action(*bot.act(ai))
+        ai._step()
+        if not ai.game_active:
+            ai._start_game()
+    ai.close()
+    return trace
+
+
+def busy_channels():
+    """Return how many mixer channels are playing."""
+    return sum(pygame.mixer.Channel(i).get_busy()
+               for i in range(pygame.mixer.get_num_channels()))
+
+
+def play_direct(trace, assets, fps):
+    """Play the trace with Sound.play(); return (requests, plays, drops, max voices, ms)."""
+    sounds = {name: assets.sound(file_name) for name, (file_name, _, _) in
+              SOUND_CATEGORIES.items()}
+    pygame.mixer.set_reserved(0)
+    plays = drops = most = 0
+    spent = 0.0
+    for frame in _paced(trace, fps):
+        start = time.perf_counter()
+        for category in frame:
+            if sounds[category].play() is None:
+                drops += 1  # Every channel was busy
+            else:
+                plays += 1
+        spent += time.perf_counter() - start
+        most = max(most, busy_channels())
+    pygame.mixer.stop()
+    return sum(map(len, trace)), plays, drops, most, spent * 1000
+
+
+def play_managed(trace, assets, fps):
+    """Play the trace through AudioManager; return its report, max voices and ms."""
+    audio = AudioManager(assets)
+    most = 0
+    spent = 0.0
+    for frame in _paced(trace, fps):
+        start = time.perf_counter()
+        for category in frame:
+            audio.play(category)
+        audio.end_frame()
+        spent += time.perf_counter() - start
+        most = max(most, busy_channels())
+    pygame.mixer.stop()
+    return audio.report(), most, spent * 1000
+
+
+def check_priority(assets):
+    """Fill every channel, then return the power-up counters after two power-ups in a row."""
+    audio = AudioManager(assets, steal_after=2)
+    for _ in range(3):
+        audio.play('laser')
+        audio.play('explosion')
+        audio.end_frame()
+    audio.end_frame()
+    # The first takes the power-up channel; the second finds that voice too
+    # young to cut off, so it must take over the oldest laser instead.
+    audio.play('powerup')
+    audio.end_frame()
+    audio.play('powerup')
+    audio.end_frame()
+    pygame.mixer.stop()
+    return audio.report()['powerup']
+
+
+def check_idle_channel(assets):
+    """Play a laser, then four explosions 10 frames apart; return the explosion counters."""
+    audio = AudioManager(assets)
+    audio.play('laser')
+    audio.end_frame()
+    # The fourth explosion finds its own channels busy and the second laser
+    # channel never used; it should play there.
+    for _ in range(4):
+        for _ in range(10):
+            audio.end_frame()
+        audio.play('explosion')
+        audio.end_frame()
+    pygame.mixer.stop()
+    return audio.report()['explosion']
+
+
+def _paced(trace, fps):
+    """Yield the trace's frames no faster than fps, so sounds finish in real time."""
+    next_frame = time.perf_counter()
+    for frame in trace:
+        yield frame
+        next_frame += 1 / fps
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600,
+                        help="Frames to record and play back, at 60 per second.")
+    parser.add_argument('--bullets', type=int, default=30, help="Bullets allowed at once.")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    trace = record_trace(args.frames, args.bullets, args.seed)
+
+    pygame.mixer.init()
+    pygame.display.set_mode((1, 1))
+    assets = AssetCache()
+    requests, plays, drops, most, ms = play_direct(trace, assets, 60)
+    report, managed_most, managed_ms = play_managed(trace, assets, 60)
+    total = report['total']
+    priority = check_priority(assets)
+    idle = check_idle_channel(assets)
+
+    print(f"{'':>8} {'requests':>9} {'coalesced':>10} {'played':>7} {'stolen':>7} "
+          f"{'dropped':>8} {'max voices':>11} {'ms total':>9}")
+    print(f"{'direct':>8} {requests:>9} {'':>10} {plays:>7} {'':>7} {drops:>8} "
+          f"{most:>11} {ms:>9.2f}")
+    print(f"{'managed':>8} {total['triggers']:>9} {total['coalesced']:>10} "
+          f"{total['plays']:>7} {total['steals']:>7} {total['drops']:>8} "
+          f"{managed_most:>11} {managed_ms:>9.2f}")
+    for name in SOUND_CATEGORIES:
+        counters = report[name]
+        print(f"  {name:<10} " + ", ".join(f"{key} {value}" for key, value in counters.items()))
+    print(f"Power-ups with every channel busy: {priority['plays']} of 2 played, "
+          f"{priority['steals']} by taking over a voice.")
+    print(f"Explosions with their own channels busy: {idle['plays']} of 4 played, "
+          f"{idle['steals']} by taking over a voice.")
+
+    reserved = sum(channels for _, channels, _ in SOUND_CATEGORIES.values())
+    if (managed_most > reserved or report['powerup']['drops'] or priority['plays'] != 2
+            or idle['plays'] != 4):
+        print("The manager played more voices than it reserved, or dropped a power-up "
+              "or an explosion it had a free channel for.")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+"""Compare spatial-hash collisions with pygame.sprite.groupcollide.
+
+Times one frame of bullet-vs-alien and ship-vs-alien checks at increasing
+fleet and bullet counts, and checks both find the same hits.
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+from pygame.sprite import Sprite, Group
+
+from collision import CollisionSystem
+
+
+class _Box(Sprite):
+    """A sprite that is only a rect."""
+
+    def __init__(self, x, y, width, height):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, height)
+
+
+class _ArrayFleet:
+    """The parts of Fleet that CollisionSystem reads, without pygame images."""
+
+    width = height = 50
+
+    def __init__(self, xs, ys):
+        self.rect_x = np.asarray(xs, dtype=np.int64)
+        self.y = np.asarray(ys, dtype=np.int64)
+        self.count = self.rect_x.size
+        self.alive = np.ones(self.count, dtype=bool)
+        self.version = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def kill(self, indices):
+        self.alive[indices] = False
+
+
+def _layout(aliens, bullets, seed=0):
+    """Return alien and bullet positions spread over a screen sized to the fleet."""
+    rng = np.random.default_rng(seed)
+    side = max(1000, int((aliens * 50 * 50 * 4) ** 0.5))  # Fleet covers about a quarter
+    alien_xy = rng.integers(0, side - 50, (aliens, 2))
+    bullet_xy = rng.integers(0, side - 20, (bullets, 2))
+    return alien_xy, bullet_xy
+
+
+def time_groupcollide(alien_xy, bullet_xy, repeats):
+    """Return (ms per frame, hit pairs) using pygame's sprite collision functions."""
+    ship = _Box(500, 500, 60, 50)
+    total = 0.0
+    for _ in range(repeats):
+        aliens = Group(_Box(x, y, 50, 50) for x, y in alien_xy)
+        bullets = Group(_Box(x, y, 5, 20) for x, y in bullet_xy)
+        index = {sprite: i for i, sprite in enumerate(aliens.sprites())}
+        order = {sprite: i for i, sprite in enumerate(bullets.sprites())}
+        start = time.perf_counter()
+        collisions = pygame.sprite.groupcollide(bullets, aliens, True, True)
+        pygame.sprite.spritecollideany(ship, aliens)
+        total += time.perf_counter() - start
+    pairs = sorted((order[b], index[a]) for b, hit in collisions.items() for a in hit)
+    return total / repeats * 1000, pairs
+
+
+def time_spatial_hash(alien_xy, bullet_xy, repeats, hash_threshold=0):
+    """Return (ms per frame, hit pairs) using CollisionSystem, including the grid rebuild."""
+    ship = pygame.Rect(500, 500, 60, 50)
+    total = 0.0
+    for _ in range(repeats):
+        fleet = _ArrayFleet(alien_xy[:, 0], alien_xy[:, 1])
+        bullets = Group(_Box(x, y, 5, 20) for x, y in bullet_xy)
+        order = {sprite: i for i, sprite in enumerate(bullets.sprites())}
+        system = CollisionSystem(hash_threshold=hash_threshold)
+        start = time.perf_counter()
+        collisions = system.bullets_vs_fleet(bullets, fleet)
+        system.ship_vs_fleet(ship, fleet)
+        total += time.perf_counter() - start
+    pairs = sorted((order[b], a) for b, hit in collisions.items() for a in hit)
+    return total / repeats * 1000, pairs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--aliens', type=int, nargs='+', default=[50, 500, 2000, 10000])
+    parser.add_argument('--bullets', type=int, nargs='+', default=[5, 50, 500])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'aliens':>7} {'bullets':>8} {'groupcollide ms':>16} {'hash ms':>8} "
+          f"{'all-pairs ms':>13} {'hash speedup':>13} {'same hits':>10}")
+    for aliens in args.aliens:
+        for bullets in args.bullets:
+            alien_xy, bullet_xy = _layout(aliens, bullets)
+            pygame_ms, pygame_pairs = time_groupcollide(alien_xy, bullet_xy, args.repeats)
+            hash_ms, hash_pairs = time_spatial_hash(alien_xy, bullet_xy, args.repeats)
+            pairs_ms, all_pairs = time_spatial_hash(alien_xy, bullet_xy, args.repeats,
+                                                    hash_threshold=aliens + 1)
+            same = pygame_pairs == hash_pairs == all_pairs
+            print(f"{aliens:>7} {bullets:>8} {pygame_ms:>16.3f} {hash_ms:>8.3f} "
+                  f"{pairs_ms:>13.3f} {pygame_ms / hash_ms:>12.1f}x {str(same):>10}")
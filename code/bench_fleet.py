@@ -0,0 +1,189 @@
+"""Compare the NumPy fleet with the original per-sprite Alien fleet.
+
+Checks that both produce the same positions when random drops are disabled,
+that drops happen at the same rate, that clearing a level frees the fleet's
+slots for the next one, and times one frame of fleet logic at increasing
+fleet sizes. Run from a directory that contains alien.png, which
+the original Alien class loads from the working directory.
+"""
+import argparse
+import os
+import random
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import alien
+from alien import Alien
+from fleet import Fleet
+from assets import AssetCache
+from settings import Settings
+
+
+class _NoDrops:
+    """Stands in for the random module in alien.py so aliens never drop."""
+
+    uniform = staticmethod(random.uniform)
+
+    @staticmethod
+    def randint(a, b):
+        return b
+
+
+def _make_game():
+    """Return the parts of a game that aliens need."""
+    settings = Settings()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    return SimpleNamespace(settings=settings, screen=screen, assets=AssetCache())
+
+
+def _legacy_fleet(game, xs, ys, vertical_speeds):
+    """Build the original sprite fleet at the given positions."""
+    aliens = pygame.sprite.Group()
+    for x, y, speed in zip(xs, ys, vertical_speeds):
+        new_alien = Alien(game)
+        new_alien.x = x
+        new_alien.rect.x = x
+        new_alien.rect.y = y
+        new_alien.vertical_speed = speed
+        aliens.add(new_alien)
+    return aliens
+
+
+def _array_fleet(game, xs, ys, vertical_speeds):
+    """Build the NumPy fleet at the same positions."""
+    fleet = Fleet(game, seed=0)
+    fleet.spawn(xs, ys)
+    fleet.vertical_speed[:fleet.count] = vertical_speeds
+    return fleet
+
+
+def legacy_step(game, aliens):
+    """Run the original per-sprite edge check, update and bottom check."""
+    for a in aliens.sprites():
+        if a.check_edges():
+            for b in aliens.sprites():
+                b.rect.y += game.settings.fleet_drop_speed
+            game.settings.fleet_direction *= -1
+            break
+    aliens.update()
+    for a in aliens.sprites():
+        if a.rect.bottom >= game.settings.screen_height:
+            break
+
+
+def fleet_step(game, fleet):
+    """Run the same frame of fleet logic on the NumPy fleet."""
+    if fleet.check_edges():
+        fleet.drop(game.settings.fleet_drop_speed)
+        game.settings.fleet_direction *= -1
+    fleet.update()
+    fleet.reached_bottom(game.settings.screen_height)
+
+
+def _layout(count, settings, seed=0):
+    """Return positions and vertical speeds for a fleet of count aliens."""
+    rng = np.random.default_rng(seed)
+    xs = rng.integers(50, settings.screen_width - 100, count)
+    ys = rng.integers(50, settings.screen_height // 2, count)
+    return xs.tolist(), ys.tolist(), rng.uniform(0.5, 1.5, count).tolist()
+
+
+def check_equivalence(frames=600):
+    """Return True if both fleets end in the same place with drops disabled."""
+    game = _make_game()
+    layout = _layout(60, game.settings)
+
+    alien.random = _NoDrops
+    try:
+        legacy = _legacy_fleet(game, *layout)
+        game.settings.fleet_direction = 1
+        for _ in range(frames):
+            legacy_step(game, legacy)
+    finally:
+        alien.random = random
+    legacy_positions = [(a.rect.x, a.rect.y) for a in legacy.sprites()]
+
+    fleet = _array_fleet(game, *layout)
+    fleet.drop_chance = 0
+    game.settings.fleet_direction = 1
+    for _ in range(frames):
+        fleet_step(game, fleet)
+    fleet_positions = list(zip(*(a.tolist() for a in fleet.positions())))
+
+    return legacy_positions == fleet_positions
+
+
+def drop_rates(frames=600):
+    """Return the fraction of alien-frames with a random drop, for each fleet."""
+    game = _make_game()
+    layout = _layout(60, game.settings)
+    game.settings.alien_speed = 0  # Keep the fleet away from the edges
+
+    legacy = _legacy_fleet(game, *layout)
+    drops = 0
+    for _ in range(frames):
+        before = [a.rect.y for a in legacy.sprites()]
+        legacy.update()
+        drops += sum(a.rect.y != y for a, y in zip(legacy.sprites(), before))
+    legacy_rate = drops / (frames * len(layout[0]))
+
+    fleet = _array_fleet(game, *layout)
+    drops = 0
+    for _ in range(frames):
+        before = fleet.y[:fleet.count].copy()
+        fleet.update()
+        drops += int(np.count_nonzero(fleet.y[:fleet.count] != before))
+    return legacy_rate, drops / (frames * len(layout[0]))
+
+
+def level_slots(levels=20, size=45):
+    """Clear levels fleets of size aliens in a row; return the slots in use and capacity."""
+    game = _make_game()
+    fleet = Fleet(game, seed=0)
+    layout = _layout(size, game.settings)
+    for _ in range(levels):
+        fleet.spawn(layout[0], layout[1])
+        for index in range(size):  # Shot down one at a time, as in a game
+            fleet_step(game, fleet)
+            fleet.kill([index])
+    fleet.spawn(layout[0], layout[1])
+    return fleet.count, fleet.x.size
+
+
+def time_step(step, game, fleet, frames):
+    """Return the mean milliseconds per frame of step."""
+    game.settings.fleet_direction = 1
+    start = time.perf_counter()
+    for _ in range(frames):
+        step(game, fleet)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000, 5000])
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"Same positions with drops disabled: {check_equivalence()}")
+    legacy_rate, fleet_rate = drop_rates()
+    print(f"Drop rate: sprites {legacy_rate:.4f}, arrays {fleet_rate:.4f} "
+          f"(expected {5 / 101:.4f})")
+
+    count, capacity = level_slots()
+    print(f"After 20 level clears: {count} slots in use for 45 aliens "
+          f"(capacity {capacity})")
+
+    game = _make_game()
+    print(f"{'aliens':>8} {'sprites ms':>11} {'arrays ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        layout = _layout(size, game.settings)
+        legacy_ms = time_step(legacy_step, game, _legacy_fleet(game, *layout), args.frames)
+        fleet_ms = time_step(fleet_step, game, _array_fleet(game, *layout), args.frames)
+        print(f"{size:>8} {legacy_ms:>11.3f} {fleet_ms:>10.3f} {legacy_ms / fleet_ms:>7.1f}x")
@@ -0,0 +1,79 @@
+"""Count bullet and power-up allocations with and without sprite pools.
+
+Plays a headless game with the tracker bot. After a warm-up it counts, over the
+measured frames, the sprites built, the garbage collections run and the peak
+memory traced by tracemalloc. The unpooled run makes the pools forget released
+sprites, so every shot and power-up builds a new sprite as the game used to.
+Exits with status 1 if the pooled game builds any sprite after warming up.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from alien_invasion import AlienInvasion
+from bots import TrackerBot
+from settings import Settings
+
+
+def measure(pooled, frames, warmup, seed):
+    """Return (sprites built, collections, peak KiB, ms per frame) for measured frames."""
+    settings = Settings()
+    settings.metrics_path = os.devnull
+    ai = AlienInvasion(settings=settings, headless=True, seed=seed)
+    bot = TrackerBot(seed=seed, fire_chance=1.0)
+    pools = (ai.bullet_pool, ai.powerup_pool)
+    if not pooled:
+        for pool in pools:
+            pool._free.clear()
+            pool.release = lambda sprite: None
+    ai._start_game()
+
+    def step(count):
+        for _ in range(count):
+            ai._apply_action(*bot.act(ai))
+            ai._step()
+            if not ai.game_active:
+                ai._start_game()
+
+    step(warmup)
+    built = sum(pool.created for pool in pools)
+    collections = [0]
+
+    def count_collections(phase, info):
+        if phase == 'start':
+            collections[0] += 1
+
+    gc.callbacks.append(count_collections)
+    tracemalloc.start()
+    start = time.perf_counter()
+    step(frames)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    gc.callbacks.remove(count_collections)
+
+    built = sum(pool.created for pool in pools) - built
+    ai.close()
+    return built, collections[0], peak / 1024, elapsed / frames * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--warmup', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'':>9} {'sprites built':>14} {'collections':>12} {'peak KiB':>9} {'ms/frame':>9}")
+    results = {}
+    for name, pooled in (('unpooled', False), ('pooled', True)):
+        results[name] = measure(pooled, args.frames, args.warmup, args.seed)
+        built, collections, peak, ms = results[name]
+        print(f"{name:>9} {built:>14} {collections:>12} {peak:>9.1f} {ms:>9.3f}")
+
+    if results['pooled'][0]:
+        print("The pooled game built sprites during play.")
+        sys.exit(1)
@@ -0,0 +1,96 @@
+"""Compare frame times of full-screen and dirty-rectangle rendering, and of the render profiles.
+
+Plays a headless game with the tracker bot under a full fleet and times
+_update_screen in each render mode, then times the idle Play screen. With
+--check, every dirty-rect frame is also compared pixel for pixel with a full
+redraw of the same state. SDL's dummy video driver makes pushing pixels to the
+display free, so real windows gain more from dirty rectangles than these
+numbers show.
+
+It then times the same game under the low and adaptive render profiles,
+which draw the playfield at a reduced internal scale. --budget-ms sets the
+adaptive profile's budget, to watch it step down and back up.
+"""
+import argparse
+import os
+import time
+
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from bots import TrackerBot
+
+
+def time_mode(mode, frames, seed, extra_aliens, check=False, profile='native',
+              budget_ms=None):
+    """Return (mean ms per playing frame, mean ms per idle frame, mismatched frames, renderer)."""
+    settings = Settings()
+    settings.metrics_path = os.devnull
+    settings.render_mode = mode
+    settings.render_profile = profile
+    settings.render_budget_ms = budget_ms
+    ai = AlienInvasion(settings=settings, headless=True, seed=seed)
+    bot = TrackerBot(seed=seed)
+    ai._start_game()
+    if extra_aliens:
+        xs = ai.aliens.rng.integers(0, settings.screen_width - ai.aliens.width, extra_aliens)
+        ys = ai.aliens.rng.integers(0, settings.screen_height // 2, extra_aliens)
+        ai.aliens.spawn(xs, ys)
+
+    total = 0.0
+    mismatches = 0
+    for _ in range(frames):
+        ai._apply_action(*bot.act(ai))
+        ai._step()
+        start = time.perf_counter()
+        ai._update_screen()
+        total += time.perf_counter() - start
+
+        if check:
+            drawn = pygame.image.tobytes(ai.screen, 'RGB')
+            ai._draw_frame()
+            mismatches += drawn != pygame.image.tobytes(ai.screen, 'RGB')
+
+    # Back on the Play screen, where nothing moves.
+    ai.game_active = False
+    start = time.perf_counter()
+    for _ in range(frames):
+        ai._update_screen()
+    idle = time.perf_counter() - start
+    ai.close()
+    return total / frames * 1000, idle / frames * 1000, mismatches, ai.renderer
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--extra-aliens', type=int, nargs='+', default=[0, 500],
+                        help="Aliens added on top of the normal fleet.")
+    parser.add_argument('--check', action='store_true',
+                        help="Check every dirty-rect frame against a full redraw.")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="The adaptive profile's drawing budget (default: half a frame).")
+    args = parser.parse_args()
+
+    print(f"{'extra aliens':>12} {'full ms':>8} {'dirty ms':>9} "
+          f"{'idle full ms':>13} {'idle dirty ms':>14}")
+    for extra in args.extra_aliens:
+        full_ms, idle_full_ms, _, _ = time_mode('full', args.frames, args.seed, extra)
+        dirty_ms, idle_dirty_ms, mismatches, _ = time_mode('dirty', args.frames, args.seed,
+                                                           extra, args.check)
+        print(f"{extra:>12} {full_ms:>8.3f} {dirty_ms:>9.3f} "
+              f"{idle_full_ms:>13.3f} {idle_dirty_ms:>14.3f}")
+        if args.check:
+            print(f"{'':>12} dirty frames differing from a full redraw: {mismatches}")
+
+    print()
+    print(f"{'extra aliens':>12} {'low ms':>7} {'adaptive ms':>12} {'final scale':>12} "
+          f"{'scale changes':>14}")
+    for extra in args.extra_aliens:
+        low_ms, _, _, _ = time_mode('full', args.frames, args.seed, extra, profile='low')
+        adaptive_ms, _, _, renderer = time_mode('full', args.frames, args.seed, extra,
+                                                profile='adaptive', budget_ms=args.budget_ms)
+        print(f"{extra:>12} {low_ms:>7.3f} {adaptive_ms:>12.3f} {renderer.scale:>12.2f} "
+              f"{renderer.scale_changes:>14}")
@@ -0,0 +1,122 @@
+"""Compare game sessions that each load the model with sessions sharing a difficulty service.
+
+Runs the same headless bot sessions side by side in separate processes, twice:
+
+- local: every session loads its own model and predicts one row at a time
+- service: one DifficultyService in this process loads the model, and the
+  sessions send their requests to it over a Unix socket
+
+For each it reports the wall time, the sessions' mean peak memory, the
+predictions the sessions received and their round-trip latency. For the
+service it also shows how requests were batched. Before that, it times the
+model predicting --sessions rows one at a time and as a single batch, which
+is the saving batching is after. Use --model pickle for the scikit-learn
+pickle instead of the compiled model.
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import Settings
+from model_watcher import load_difficulty_model
+
+
+def make_settings(model):
+    """Return settings that load the chosen model and throw the metrics away."""
+    settings = Settings()
+    settings.metrics_path = os.devnull
+    settings.model_poll_interval = 0
+    if model == 'pickle':
+        settings.models_dir = settings.compiled_model_path = os.path.join(
+            tempfile.gettempdir(), 'no-such-model')
+    return settings
+
+
+def run_session(index, frames, model, service):
+    """Play one headless session in this process and return its statistics."""
+    from alien_invasion import AlienInvasion
+    from bots import make_bot
+
+    settings = make_settings(model)
+    settings.difficulty_service = service
+    ai = AlienInvasion(settings=settings, headless=True, seed=index)
+    ai.run_headless(make_bot('tracker', seed=index), max_frames=frames)
+    ai.close()
+    report = ai.difficulty_worker.report()
+    return {
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'predictions': report['predictions'],
+        'latency_ms_p95': report['latency_ms_p95'],
+        'service_lost': report.get('service_lost', False),
+    }
+
+
+def run_sessions(count, frames, model, service=None):
+    """Run count sessions at once, each in a fresh process; return their results and wall time."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=count, max_tasks_per_child=1) as pool:
+        results = list(pool.map(run_session, range(count), [frames] * count,
+                                [model] * count, [service] * count))
+    return results, time.perf_counter() - start
+
+
+def time_predictions(model, rows, repeat=20):
+    """Return ms to predict rows one call per row, and as one batched call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row in rows:
+            model.predict([row])
+    single = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(rows)
+    batched = (time.perf_counter() - start) / repeat
+    return single * 1000, batched * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=8, help="Sessions run at once.")
+    parser.add_argument('--frames', type=int, default=5000, help="Frames per session.")
+    parser.add_argument('--model', choices=('compiled', 'pickle'), default='compiled')
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    from difficulty_service import DifficultyService
+
+    model, _ = load_difficulty_model(make_settings(args.model))
+    rows = [[0.3 + 0.01 * i, 0.5, i % 3] for i in range(args.sessions)]
+    single, batched = time_predictions(model, rows)
+    print(f"{args.sessions} rows: {single:.2f} ms one at a time, {batched:.2f} ms as one batch")
+
+    local, local_time = run_sessions(args.sessions, args.frames, args.model)
+
+    service = DifficultyService(model, window=args.window_ms / 1000)
+    address = os.path.join(tempfile.mkdtemp(), 'difficulty.sock')
+    service.serve(address)
+    served, served_time = run_sessions(args.sessions, args.frames, args.model, address)
+    service.close()
+    os.rmdir(os.path.dirname(address))
+
+    print(f"{'':>8} {'seconds':>8} {'MB/session':>11} {'predictions':>12} {'p95 ms':>7}")
+    for name, results, elapsed in (('local', local, local_time),
+                                   ('service', served, served_time)):
+        rss = sum(r['rss_mb'] for r in results) / len(results)
+        predictions = sum(r['predictions'] for r in results)
+        p95 = max(r['latency_ms_p95'] for r in results)
+        print(f"{name:>8} {elapsed:>8.2f} {rss:>11.1f} {predictions:>12} {p95:>7.2f}")
+    if any(r['service_lost'] for r in served):
+        print("Some sessions lost the service and predicted locally.")
+
+    report = service.report()
+    print(f"Service: {report['requests']} requests in {report['batches']} batches, "
+          f"batch size mean {report['batch_mean']:.1f}, p50 {report['batch_p50']:.0f}, "
+          f"p95 {report['batch_p95']:.0f}, max {report['batch_max']:.0f}")
+    print("  batch sizes: " + ", ".join(f"{label}: {count}" for label, count in
+                                        report['batch_histogram'].items()))
+    print(f"  predict ms p50 {report['predict_ms_p50']:.3f}, p95 {report['predict_ms_p95']:.3f}; "
+          f"queued to answered ms p50 {report['latency_ms_p50']:.2f}, "
+          f"p95 {report['latency_ms_p95']:.2f}")
@@ -0,0 +1,79 @@
+"""Measure how long the game takes to start, phase by phase.
+
+Each run starts a fresh interpreter, so nothing is already imported or cached
+in memory. It reports these phases:
+
+- imports: importing alien_invasion and everything it pulls in
+- display: pygame and the window
+- assets: loading images and sounds
+- objects: the scoreboard, ship, fleet and other game objects
+- first frame: the time until the first Play screen has been drawn
+- model: the background model load, and when the model was ready
+- metrics: the background import behind the metrics writer, and when it was ready
+
+Times are medians over --runs. Use --model pickle to time the unpacked
+scikit-learn pickle instead of the compiled model.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def measure(model, workdir):
+    """Start a headless game in this process and return its startup times in ms."""
+    start = time.perf_counter()
+    from settings import Settings
+    from alien_invasion import AlienInvasion
+    imported = time.perf_counter()
+
+    settings = Settings()
+    settings.metrics_path = os.path.join(workdir, 'startup.csv')
+    if model == 'pickle':
+        settings.models_dir = settings.compiled_model_path = os.path.join(workdir, 'none')
+    ai = AlienInvasion(settings=settings, headless=True)
+    ai._update_screen()
+    first_frame = time.perf_counter()
+
+    ai.model_ready.wait()
+    model_ready = time.perf_counter()
+    ai.metrics_sink.ready.wait()
+    metrics_ready = time.perf_counter()
+    ai.close()
+
+    times = {'imports': (imported - start) * 1000}
+    times.update(ai.startup)
+    times['first_frame_at'] = (first_frame - start) * 1000
+    times['model_ready_at'] = (model_ready - start) * 1000
+    times['metrics'] = ai.metrics_sink.warmup_time * 1000
+    times['metrics_ready_at'] = (metrics_ready - start) * 1000
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--model', choices=['compiled', 'pickle'], default='compiled')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as workdir:
+            print(json.dumps(measure(args.model, workdir)))
+        sys.exit(0)
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, '-W', 'ignore', __file__, '--child', '--model', args.model],
+            check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'phase':<18} {'median ms':>10}")
+    for phase in ('imports', 'display', 'assets', 'objects', 'first_frame_at',
+                  'model', 'model_ready_at', 'metrics', 'metrics_ready_at'):
+        print(f"{phase:<18} {statistics.median(run[phase] for run in runs):>10.1f}")
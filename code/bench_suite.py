@@ -0,0 +1,262 @@
+"""Benchmark the game's hot paths and compare the results with a saved baseline.
+
+Runs headlessly with SDL's dummy drivers and measures:
+
+- frames per second of the game step at several fleet and bullet sizes
+- bullet and ship collision checks against large fleets
+- full and dirty-rect rendering
+- single-row latency of the difficulty model
+- the cost of one save_metrics call, with the rolling statistics updated before each
+- cold startup, from a fresh interpreter to a ready game
+
+Each metric is the median of several runs. The first run on a machine, or a
+run with --save, writes the results to the baseline file. Later runs compare
+against it and exit with status 1 if any metric got worse by more than
+--threshold. Baselines only mean something on the machine that recorded them.
+Run from the code directory, like the game.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from bots import TrackerBot
+
+# (aliens, bullets) for the game step and collision benchmarks.
+STEP_SIZES = [(60, 5), (500, 5), (500, 50), (2000, 50)]
+COLLISION_SIZES = [(500, 50), (5000, 500)]
+
+
+def _game(workdir, seed, **overrides):
+    """Return a started headless game that writes its metrics under workdir."""
+    settings = Settings()
+    settings.metrics_path = os.path.join(workdir, 'metrics.csv')
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    ai = AlienInvasion(settings=settings, headless=True, seed=seed)
+    ai._start_game()
+    return ai
+
+
+def _fill_fleet(ai, total):
+    """Add aliens in the middle of the upper half of the screen until there are total."""
+    extra = total - len(ai.aliens)
+    if extra > 0:
+        settings = ai.settings
+        xs = ai.aliens.rng.integers(100, settings.screen_width - 150, extra)
+        ys = ai.aliens.rng.integers(0, settings.screen_height // 2, extra)
+        ai.aliens.spawn(xs, ys)
+
+
+def _play(ai, bot, frames, aliens, render=False):
+    """Play frames with bot, restarting games as they end; return the seconds spent."""
+    elapsed = 0.0
+    for _ in range(frames):
+        ai._apply_action(*bot.act(ai))
+        start = time.perf_counter()
+        if render:
+            ai._update_screen()
+        else:
+            ai._step()
+        elapsed += time.perf_counter() - start
+        if render:
+            ai._step()
+        if not ai.game_active:
+            ai._start_game()
+            _fill_fleet(ai, aliens)
+    return elapsed
+
+
+def bench_step(workdir, aliens, bullets, frames, seed):
+    """Return frames per second of the game step with the given fleet and bullets."""
+    ai = _game(workdir, seed, bullets_allowed=bullets)
+    _fill_fleet(ai, aliens)
+    elapsed = _play(ai, TrackerBot(seed=seed, fire_chance=1.0), frames, aliens)
+    ai.close()
+    return frames / elapsed
+
+
+def bench_collision(workdir, aliens, bullets, repeats, seed):
+    """Return milliseconds for one frame of bullet and ship checks against a fleet."""
+    ai = _game(workdir, seed, bullets_allowed=bullets)
+    rng = np.random.default_rng(seed)
+    width, height = ai.settings.screen_width, ai.settings.screen_height
+    alien_x = rng.integers(0, width - 50, aliens)
+    alien_y = rng.integers(0, height - 50, aliens)
+    bullet_xy = rng.integers(0, min(width, height) - 20, (bullets, 2)).tolist()
+
+    times = []
+    for _ in range(repeats):
+        ai.aliens.empty()
+        ai.aliens.spawn(alien_x, alien_y)
+        ai.bullets.empty()
+        for x, y in bullet_xy:
+            bullet = ai.bullet_pool.acquire()
+            bullet.rect.topleft = (x, y)
+            ai.bullets.add(bullet)
+        start = time.perf_counter()
+        ai.collisions.bullets_vs_fleet(ai.bullets, ai.aliens)
+        ai.collisions.ship_vs_fleet(ai.ship.rect, ai.aliens)
+        times.append(time.perf_counter() - start)
+    ai.close()
+    return statistics.median(times) * 1000
+
+
+def bench_render(workdir, mode, frames, seed):
+    """Return mean milliseconds per _update_screen call in the given render mode."""
+    ai = _game(workdir, seed, render_mode=mode)
+    elapsed = _play(ai, TrackerBot(seed=seed), frames, 0, render=True)
+    ai.close()
+    return elapsed / frames * 1000
+
+
+def bench_predict(model, calls):
+    """Return the median microseconds for one single-row model prediction."""
+    row = [[0.4, 0.5, 1.0]]
+    model.predict(row)
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        model.predict(row)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def bench_save_metrics(workdir, calls, seed):
+    """Return mean microseconds per save_metrics call, each after a new shot and reaction time."""
+    ai = _game(workdir, seed)
+    stats = ai.stats
+    start = time.perf_counter()
+    for i in range(calls):
+        shot = stats.record_shot()
+        if i % 3 == 0:
+            stats.record_hit(shot)
+        stats.record_reaction(0.2 + 0.05 * (i % 10))
+        ai.save_metrics()
+    elapsed = time.perf_counter() - start
+    ai.close()
+    return elapsed / calls * 1e6
+
+
+def bench_startup(workdir):
+    """Return seconds from starting a new interpreter to a ready headless game."""
+    code = (
+        "from settings import Settings\n"
+        "from alien_invasion import AlienInvasion\n"
+        "settings = Settings()\n"
+        f"settings.metrics_path = {os.path.join(workdir, 'startup.csv')!r}\n"
+        "AlienInvasion(settings=settings, headless=True).close()\n"
+    )
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run_suite(repeats=3, frames=300, seed=1):
+    """Run every benchmark and return {name: {'value', 'unit', 'better'}}."""
+    results = {}
+
+    def record(name, unit, better, measure):
+        value = statistics.median(measure() for _ in range(repeats))
+        results[name] = {'value': value, 'unit': unit, 'better': better}
+        print(f"  {name:<36} {value:>12.3f} {unit}", flush=True)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for aliens, bullets in STEP_SIZES:
+            record(f"step_fps[aliens={aliens},bullets={bullets}]", 'fps', 'higher',
+                   lambda: bench_step(workdir, aliens, bullets, frames, seed))
+        for aliens, bullets in COLLISION_SIZES:
+            record(f"collision_ms[aliens={aliens},bullets={bullets}]", 'ms', 'lower',
+                   lambda: bench_collision(workdir, aliens, bullets, 20, seed))
+        for mode in ('full', 'dirty'):
+            record(f"render_ms[{mode}]", 'ms', 'lower',
+                   lambda: bench_render(workdir, mode, frames, seed))
+
+        ai = _game(workdir, seed)
+        ai.model_ready.wait()  # The model loads in the background
+        models = {'game': ai.model} if ai.model is not None else {}
+        if os.path.exists(ai.settings.model_path):
+            import joblib
+            models['pickle'] = joblib.load(ai.settings.model_path)
+        ai.close()
+        for name, model in models.items():
+            record(f"predict_us[{name}]", 'us', 'lower', lambda: bench_predict(model, 2000))
+
+        record("save_metrics_us", 'us', 'lower',
+               lambda: bench_save_metrics(workdir, 20000, seed))
+        record("startup_s", 's', 'lower', lambda: bench_startup(workdir))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print each metric's change from the baseline and return the names that regressed."""
+    regressions = []
+    print(f"{'metric':<38} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, metric in results.items():
+        base = baseline.get(name)
+        if base is None or not base['value']:
+            print(f"{name:<38} {'-':>12} {metric['value']:>12.3f} {'new':>8}")
+            continue
+        change = metric['value'] / base['value'] - 1
+        worse = change > threshold if metric['better'] == 'lower' else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"{name:<38} {base['value']:>12.3f} {metric['value']:>12.3f} "
+              f"{change:>+7.1%}{'  REGRESSED' if worse else ''}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--baseline', default='bench_baseline.json',
+                        help="Baseline results to compare against, or to create.")
+    parser.add_argument('--save', action='store_true',
+                        help="Replace the baseline with this run's results.")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed slowdown before a metric counts as a regression "
+                             "(0.25 is 25%%).")
+    parser.add_argument('--output', default=None,
+                        help="Also write this run's results to this file.")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    pygame.init()
+    print("Running benchmarks...")
+    report = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'pygame': pygame.version.ver, 'numpy': np.__version__},
+        'metrics': run_suite(args.repeats, args.frames, args.seed),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}.")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['metrics']
+    regressions = compare(report['metrics'], baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}.")
+        sys.exit(1)
+    print(f"No metric regressed by more than {args.threshold:.0%}.")
@@ -0,0 +1,70 @@
+import random
+
+
+class RandomBot:
+    """A bot that moves and fires at random."""
+
+    def __init__(self, seed=None, fire_chance=0.1, turn_chance=0.05):
+        """Initialize the bot's random number generator and habits."""
+        self.random = random.Random(seed)
+        self.fire_chance = fire_chance  # Chance to fire on any frame
+        self.turn_chance = turn_chance  # Chance to pick a new direction on any frame
+        self.move = 0
+
+    def act(self, ai_game):
+        """Return (move, fire) for this frame."""
+        if self.random.random() < self.turn_chance:
+            self.move = self.random.choice((-1, 0, 1))
+        return self.move, self.random.random() < self.fire_chance
+
+
+class TrackerBot:
+    """A bot that steers under the nearest alien and fires when lined up."""
+
+    def __init__(self, seed=None, aim_tolerance=15, fire_chance=0.5, reaction_frames=0):
+        """Initialize the bot's skill settings."""
+        self.random = random.Random(seed)
+        self.aim_tolerance = aim_tolerance  # Pixels off-center that still count as lined up
+        self.fire_chance = fire_chance  # Chance to fire when lined up
+        self.reaction_frames = reaction_frames  # Frames between picking new targets
+        self._target_x = None
+        self._frames_to_retarget = 0
+
+    def act(self, ai_game):
+        """Return (move, fire) for this frame."""
+        ship_rect = ai_game.ship.rect
+        if self._frames_to_retarget <= 0 or self._target_x is None:
+            self._target_x = self._nearest_alien_x(ai_game)
+            self._frames_to_retarget = self.reaction_frames
+        self._frames_to_retarget -= 1
+
+        if self._target_x is None:
+            return 0, False
+
+        offset = self._target_x - ship_rect.centerx
+        if abs(offset) <= self.aim_tolerance:
+            return 0, self.random.random() < self.fire_chance
+        return (1 if offset > 0 else -1), False
+
+    def _nearest_alien_x(self, ai_game):
+        """Return the x position of the alien closest to the ship, or None."""
+        fleet = ai_game.aliens
+        if not fleet:
+            return None
+        ship_x, ship_y = ai_game.ship.rect.center
+        xs, ys = fleet.positions()
+        xs = xs + fleet.width // 2
+        ys = ys + fleet.height // 2
+        nearest = ((xs - ship_x) ** 2 + (ys - ship_y) ** 2).argmin()
+        return int(xs[nearest])
+
+
+BOTS = {
+    'random': RandomBot,
+    'tracker': TrackerBot,
+}
+
+
+def make_bot(name, seed=None, **skill):
+    """Create a bot by name, passing any skill settings through."""
+    return BOTS[name](seed=seed, **skill)
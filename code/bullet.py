@@ -1,7 +1,7 @@
 import pygame
-from pygame.sprite import Sprite
+from sprite_pool import PooledSprite
 
-class Bullet(Sprite):
+class Bullet(PooledSprite):
     """A class to manage bullets fired from the ship."""
 
     def __init__(self, ai_game):
@@ -9,27 +9,46 @@ class Bullet(Sprite):
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ship = ai_game.ship
         self.color = self.settings.bullet_color
 
-        # Create a bullet rect at (0, 0) and then set correct position.
+        # Create a bullet rect at (0, 0); reset() moves it to the ship.
         self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+
+        # Bullet speed effect and design
+        self.speed_effect = 1.5  # Speed effect multiplier
+        # Every bullet shares one surface filled with the bullet color.
+        self.image = ai_game.assets.surface(
+            (self.settings.bullet_width, self.settings.bullet_height), self.color)
+
+        self.reset()
+
+    def reset(self):
+        """Move the bullet back to the ship's current position."""
+        self.rect.midtop = self.ship.rect.midtop
 
         # Store the bullet's position as a float.
         self.y = float(self.rect.y)
 
-        # Bullet speed effect and design
-        self.speed_effect = 1.5  # Speed effect multiplier
-        self.image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height))
-        self.image.fill(self.color)  # Create a surface for the bullet with the specified color
+        # Which shot this is in the game's statistics; set when it's fired.
+        self.shot = None
 
     def update(self):
-        """Move the bullet up the screen."""
+        """Move the bullet up the screen, and get rid of it once it's off the top."""
         # Update the exact position of the bullet.
         self.y -= self.settings.bullet_speed * self.speed_effect  # Applying speed effect
         # Update the rect position.
         self.rect.y = self.y
+        if self.rect.bottom <= 0:
+            self.kill()
+
+    def draw_bullet(self, behind=0.0, surface=None):
+        """Draw the bullet to surface, the screen by default, and return the area drawn.
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        self.screen.blit(self.image, self.rect)  # Draw the bullet image
+        behind draws it that fraction of a step back along its path.
+        """
+        surface = self.screen if surface is None else surface
+        if not behind:
+            return surface.blit(self.image, self.rect)  # Draw the bullet image
+        y = self.y + behind * self.settings.bullet_speed * self.speed_effect
+        return surface.blit(self.image, (self.rect.x, round(y)))
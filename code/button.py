@@ -30,6 +30,7 @@ class Button:
         self.msg_image_rect.center = self.rect.center
 
     def draw_button(self, mouse_pos=None):
-        """Draw blank button and then draw message."""
+        """Draw blank button and then draw message. Return the button's area."""
         self.screen.fill(self.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
+        return self.rect
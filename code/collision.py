@@ -0,0 +1,209 @@
+import numpy as np
+
+
+class SpatialHash:
+    """A class to find which of many boxes overlap a rect, using a uniform grid."""
+
+    def __init__(self, cell_size=64):
+        """Initialize an empty grid with square cells of cell_size pixels."""
+        self.cell_size = cell_size
+        self.left = self.top = self.right = self.bottom = np.zeros(0, dtype=np.int64)
+        self._origin = (0, 0)
+        self._shape = (0, 0)
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._boxes = np.zeros(0, dtype=np.int64)
+
+    def build(self, xs, ys, width, height):
+        """Rebuild the grid from box corners and a size shared by all boxes or one per box."""
+        self.left = np.asarray(xs, dtype=np.int64)
+        self.top = np.asarray(ys, dtype=np.int64)
+        self.right = self.left + width
+        self.bottom = self.top + height
+        if not self.left.size:
+            self._shape = (0, 0)
+            self._starts = np.zeros(1, dtype=np.int64)
+            self._boxes = np.zeros(0, dtype=np.int64)
+            return
+
+        # The grid only covers the cells the boxes touch.
+        cx0, cx1 = self._cells(self.left, self.right)
+        cy0, cy1 = self._cells(self.top, self.bottom)
+        self._origin = (int(cx0.min()), int(cy0.min()))
+        self._shape = (int(cy1.max()) - self._origin[1] + 1,
+                       int(cx1.max()) - self._origin[0] + 1)
+
+        # File each box under every cell it touches, then counting-sort by cell.
+        boxes, cells = self._expand(np.arange(self.left.size), cx0, cx1, cy0, cy1)
+        n_cells = self._shape[0] * self._shape[1]
+        counts = np.bincount(cells, minlength=n_cells)
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+        if n_cells <= np.iinfo(np.uint16).max:
+            cells = cells.astype(np.uint16)  # NumPy radix-sorts 16-bit keys in O(n)
+        self._boxes = boxes[np.argsort(cells, kind='stable')]
+
+    def query(self, rect):
+        """Return the indices of the boxes that overlap rect."""
+        rects, boxes = self.query_many([rect.left], [rect.top], [rect.right], [rect.bottom])
+        return boxes
+
+    def query_many(self, lefts, tops, rights, bottoms):
+        """Return (rect, box) index arrays for every overlapping pair, in rect order."""
+        lefts, tops, rights, bottoms = (np.asarray(a, dtype=np.int64)
+                                        for a in (lefts, tops, rights, bottoms))
+        empty = np.zeros(0, dtype=np.int64)
+        if not self._boxes.size or not lefts.size:
+            return empty, empty
+
+        # Clip each rect's cell range to the grid; rects off the grid get none.
+        rows, cols = self._shape
+        cx0, cx1 = self._cells(lefts, rights)
+        cy0, cy1 = self._cells(tops, bottoms)
+        cx0 = np.maximum(cx0 - self._origin[0], 0)
+        cx1 = np.minimum(cx1 - self._origin[0], cols - 1)
+        cy0 = np.maximum(cy0 - self._origin[1], 0)
+        cy1 = np.minimum(cy1 - self._origin[1], rows - 1)
+        owners, cells = self._expand(np.arange(lefts.size), cx0 + self._origin[0],
+                                     cx1 + self._origin[0], cy0 + self._origin[1],
+                                     cy1 + self._origin[1])
+
+        # Every box filed under each (rect, cell) pair is a candidate.
+        starts = self._starts[cells]
+        lengths = self._starts[cells + 1] - starts
+        rects = np.repeat(owners, lengths)
+        offsets = np.arange(rects.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        boxes = self._boxes[np.repeat(starts, lengths) + offsets]
+
+        # A box touching several cells of the rect is found once per cell.
+        if rects.size:
+            pair_keys = rects * self.left.size + boxes
+            _, first = np.unique(pair_keys, return_index=True)
+            rects, boxes = rects[first], boxes[first]
+
+        # The same overlap test as pygame.Rect.colliderect.
+        hit = ((self.left[boxes] < rights[rects]) & (self.right[boxes] > lefts[rects])
+               & (self.top[boxes] < bottoms[rects]) & (self.bottom[boxes] > tops[rects])
+               & (rights[rects] > lefts[rects]) & (bottoms[rects] > tops[rects]))
+        return rects[hit], boxes[hit]
+
+    def _cells(self, low, high):
+        """Return the first and last cell covered by the pixel span [low, high)."""
+        return low // self.cell_size, (np.maximum(high, low + 1) - 1) // self.cell_size
+
+    def _expand(self, owners, cx0, cx1, cy0, cy1):
+        """Return (owner, grid cell) pairs for every cell in each owner's cell range."""
+        span_x = np.maximum(cx1 - cx0 + 1, 0)
+        counts = span_x * np.maximum(cy1 - cy0 + 1, 0)
+        if counts.size and counts.max() <= 4 and span_x.max() <= 2:
+            # Rects no bigger than a cell touch at most the 2x2 cells at their corners.
+            if not counts.all():
+                touching = counts > 0
+                owners, cx0, cx1, cy0, cy1 = (a[touching] for a in (owners, cx0, cx1, cy0, cy1))
+            cols = self._shape[1]
+            base = (cy0 - self._origin[1]) * cols + (cx0 - self._origin[0])
+            wide = cx1 > cx0
+            tall = cy1 > cy0
+            both = wide & tall
+            return (np.concatenate((owners, owners[wide], owners[tall], owners[both])),
+                    np.concatenate((base, base[wide] + 1, base[tall] + cols,
+                                    base[both] + cols + 1)))
+        which = np.repeat(np.arange(owners.size), counts)
+        local = np.arange(which.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = cx0[which] + local % span_x[which] - self._origin[0]
+        cy = cy0[which] + local // span_x[which] - self._origin[1]
+        return owners[which], cy * self._shape[1] + cx
+
+
+class CollisionSystem:
+    """A class to answer the game's collision queries through spatial hashes."""
+
+    def __init__(self, cell_size=64, hash_threshold=256):
+        """Initialize the grid used for the alien fleet."""
+        self.fleet_hash = SpatialHash(cell_size)
+        self._fleet_version = None
+
+        # Below this many aliens, testing every pair at once is cheaper than
+        # rebuilding the grid.
+        self.hash_threshold = hash_threshold
+
+    def bullets_vs_fleet(self, bullets, fleet, dokill_bullets=True):
+        """Kill every alien hit by a bullet, like pygame.sprite.groupcollide.
+
+        Return a dictionary mapping each bullet that hit something to the
+        indices of the aliens it hit.
+        """
+        collisions = {}
+        sprites = bullets.sprites()
+        if not len(fleet) or not sprites:
+            return collisions
+
+        # Query every bullet at once; pairs come back in bullet order.
+        boxes = np.array([tuple(sprite.rect) for sprite in sprites], dtype=np.int64)
+        owners, hit = self._fleet_pairs(fleet, boxes[:, 0], boxes[:, 1],
+                                        boxes[:, 0] + boxes[:, 2], boxes[:, 1] + boxes[:, 3])
+
+        # As in groupcollide, an alien belongs to the first bullet that hits it.
+        _, first = np.unique(hit, return_index=True)
+        first.sort()
+        owners, hit = owners[first], hit[first]
+        if not hit.size:
+            return collisions
+        fleet.kill(hit)
+
+        bounds = np.flatnonzero(np.diff(owners)) + 1
+        for owner, group_hit in zip(owners[np.concatenate(([0], bounds))].tolist(),
+                                    np.split(hit, bounds)):
+            bullet = sprites[owner]
+            collisions[bullet] = group_hit.tolist()
+            if dokill_bullets:
+                bullet.kill()
+        return collisions
+
+    def ship_vs_fleet(self, rect, fleet):
+        """Return True if any living alien overlaps rect."""
+        if not len(fleet):
+            return False
+        owners, hit = self._fleet_pairs(fleet, [rect.left], [rect.top],
+                                        [rect.right], [rect.bottom])
+        return hit.size > 0
+
+    def ship_vs_group(self, rect, group, dokill=False):
+        """Return the sprites in group that overlap rect, removing them if dokill."""
+        sprites = group.sprites()
+        if not sprites:
+            return []
+        if len(sprites) < self.hash_threshold:
+            # A handful of power-ups: pygame's own test is cheaper than building a grid.
+            hit = [sprites[i] for i in rect.collidelistall([sprite.rect for sprite in sprites])]
+        else:
+            boxes = np.array([tuple(sprite.rect) for sprite in sprites], dtype=np.int64)
+            grid = SpatialHash(self.fleet_hash.cell_size)
+            grid.build(boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3])
+            hit = [sprites[i] for i in grid.query(rect).tolist()]
+        if dokill:
+            for sprite in hit:
+                sprite.kill()
+        return hit
+
+    def _fleet_pairs(self, fleet, lefts, tops, rights, bottoms):
+        """Return (rect, alien) index arrays for each rect overlapping a living alien."""
+        if fleet.count >= self.hash_threshold:
+            self._refresh(fleet)
+            owners, hit = self.fleet_hash.query_many(lefts, tops, rights, bottoms)
+            living = fleet.alive[hit]
+            return owners[living], hit[living]
+
+        # Small fleets: test every rect against every alien in one go.
+        lefts, tops, rights, bottoms = (np.asarray(a, dtype=np.int64)[:, None]
+                                        for a in (lefts, tops, rights, bottoms))
+        xs, ys = fleet.rect_x[:fleet.count], fleet.y[:fleet.count]
+        overlap = ((xs < rights) & (xs + fleet.width > lefts) & (ys < bottoms)
+                   & (ys + fleet.height > tops) & (rights > lefts) & (bottoms > tops)
+                   & fleet.alive[:fleet.count])
+        return np.nonzero(overlap)
+
+    def _refresh(self, fleet):
+        """Rebuild the fleet grid if the fleet has moved since the last build."""
+        if self._fleet_version != fleet.version:
+            n = fleet.count
+            self.fleet_hash.build(fleet.rect_x[:n], fleet.y[:n], fleet.width, fleet.height)
+            self._fleet_version = fleet.version
@@ -0,0 +1,268 @@
+import json
+import os
+from bisect import bisect_right
+from itertools import product
+
+import numpy as np
+
+
+class CompiledForest:
+    """A class to evaluate a tree ensemble from flat NumPy arrays."""
+
+    kind = 'forest'
+
+    def __init__(self, feature, threshold, children_left, children_right, value,
+                 roots, depth, scale=None, offset=0.0):
+        """Store the packed node arrays of every tree.
+
+        A prediction is offset + scale * (sum of the trees' leaf values). The
+        default scale averages the trees, as a random forest does.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.scale = 1.0 / len(roots) if scale is None else float(scale)
+        self.offset = float(offset)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Pack the trees of a fitted sklearn forest, gradient boosting model or tree."""
+        estimators = getattr(model, 'estimators_', [model])
+        scale, base = None, 0.0
+        if hasattr(model, 'init_'):
+            # Gradient boosting: a constant start plus every tree times the learning rate.
+            estimators = estimators[:, 0]
+            scale = model.learning_rate
+            base = float(np.ravel(model.init_.constant_)[0])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            nodes = np.arange(offset, offset + n, dtype=np.int32)
+
+            # Leaves point back at themselves, so every tree can be walked for
+            # the same number of steps without checking for leaves.
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, nodes, tree.children_right + offset).astype(np.int32))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+
+            offset += n
+            depth = max(depth, tree.max_depth)
+
+        return cls(np.concatenate(features), np.concatenate(thresholds),
+                   np.concatenate(lefts), np.concatenate(rights),
+                   np.concatenate(values), np.array(roots, dtype=np.int32), depth,
+                   scale, base)
+
+    def predict(self, X):
+        """Predict one value per row of X, like sklearn's predict."""
+        # sklearn compares float32 features against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return self.offset + self.scale * self.value[nodes].sum(axis=1)
+
+    def predict_one(self, row):
+        """Predict a single row of features."""
+        x = np.asarray(row, dtype=np.float32)
+        nodes = self.roots
+        for _ in range(self.depth):
+            go_left = x[self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return float(self.offset + self.scale * self.value[nodes].sum())
+
+    def arrays(self):
+        """Return the arrays that make up the compiled model."""
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children_left': self.children_left,
+            'children_right': self.children_right,
+            'value': self.value,
+            'roots': self.roots,
+        }
+
+    def meta(self):
+        """Return the scalar settings of the compiled model."""
+        return {'depth': self.depth, 'scale': self.scale, 'offset': self.offset}
+
+
+class CompiledLinear:
+    """A class to evaluate a fitted linear model from its coefficients."""
+
+    kind = 'linear'
+
+    def __init__(self, coef, intercept):
+        """Store the coefficients and intercept."""
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Copy the coefficients of a fitted sklearn linear model."""
+        return cls(np.ravel(model.coef_), np.ravel(model.intercept_)[0])
+
+    def predict(self, X):
+        """Predict one value per row of X, like sklearn's predict."""
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict_one(self, row):
+        """Predict a single row of features."""
+        return float(np.dot(self.coef, row) + self.intercept)
+
+    def arrays(self):
+        """Return the arrays that make up the compiled model."""
+        return {'coef': self.coef}
+
+    def meta(self):
+        """Return the scalar settings of the compiled model."""
+        return {'intercept': self.intercept}
+
+
+class LookupGrid:
+    """A class to predict by interpolating over a dense grid of precomputed values."""
+
+    kind = 'grid'
+
+    def __init__(self, axes, values):
+        """Store the grid axes and the value at every grid point."""
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        self.values = values
+        self._axis_lists = None
+
+    @classmethod
+    def from_model(cls, model, axes):
+        """Evaluate a model at every point of the grid spanned by axes."""
+        axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        mesh = np.meshgrid(*axes, indexing='ij')
+        points = np.stack([m.ravel() for m in mesh], axis=1)
+        values = np.asarray(model.predict(points), dtype=np.float64)
+        return cls(axes, values.reshape([axis.size for axis in axes]))
+
+    def predict(self, X):
+        """Interpolate linearly between grid points, clamping at the grid edges."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        result = np.zeros(X.shape[0])
+        lows, weights = [], []
+        for dim, axis in enumerate(self.axes):
+            x = np.clip(X[:, dim], axis[0], axis[-1])
+            low = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, max(axis.size - 2, 0))
+            high = np.minimum(low + 1, axis.size - 1)
+            span = axis[high] - axis[low]
+            weight = np.divide(x - axis[low], span, out=np.zeros_like(x), where=span > 0)
+            lows.append(low)
+            weights.append(weight)
+
+        # Sum the contribution of every corner of the surrounding cell.
+        for corner in range(2 ** len(self.axes)):
+            index = []
+            corner_weight = np.ones(X.shape[0])
+            for dim, axis in enumerate(self.axes):
+                upper = (corner >> dim) & 1
+                index.append(np.minimum(lows[dim] + upper, axis.size - 1))
+                corner_weight *= weights[dim] if upper else 1 - weights[dim]
+            result += corner_weight * self.values[tuple(index)]
+        return result
+
+    def predict_one(self, row):
+        """Predict a single row of features with scalar arithmetic."""
+        if self._axis_lists is None:
+            self._axis_lists = [axis.tolist() for axis in self.axes]
+        cells = []
+        for x, axis in zip(row, self._axis_lists):
+            x = min(max(x, axis[0]), axis[-1])
+            low = min(max(bisect_right(axis, x) - 1, 0), max(len(axis) - 2, 0))
+            high = min(low + 1, len(axis) - 1)
+            span = axis[high] - axis[low]
+            cells.append((low, high, (x - axis[low]) / span if span > 0 else 0.0))
+
+        result = 0.0
+        for corner in product((0, 1), repeat=len(cells)):
+            index = []
+            weight = 1.0
+            for upper, (low, high, w) in zip(corner, cells):
+                index.append(high if upper else low)
+                weight *= w if upper else 1 - w
+            if weight:
+                result += weight * float(self.values[tuple(index)])
+        return result
+
+    def arrays(self):
+        """Return the arrays that make up the grid."""
+        arrays = {f'axis{dim}': axis for dim, axis in enumerate(self.axes)}
+        arrays['values'] = self.values
+        return arrays
+
+    def meta(self):
+        """Return the scalar settings of the grid."""
+        return {'dimensions': len(self.axes)}
+
+
+def save_compiled_model(model, path):
+    """Save a compiled model as a directory of .npy files that can be memory-mapped."""
+    os.makedirs(path, exist_ok=True)
+    for name, array in model.arrays().items():
+        np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(array))
+    meta = dict(model.meta(), kind=model.kind)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_compiled_model(path, mmap_mode='r'):
+    """Load a model saved by save_compiled_model, memory-mapping its arrays."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+
+    def load(name):
+        # Plain ndarray views of the memory map skip the memmap subclass overhead.
+        return np.asarray(np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+
+    if meta['kind'] == 'grid':
+        axes = [load(f'axis{dim}') for dim in range(meta['dimensions'])]
+        return LookupGrid(axes, load('values'))
+    if meta['kind'] == 'linear':
+        return CompiledLinear(load('coef'), meta['intercept'])
+    return CompiledForest(load('feature'), load('threshold'), load('children_left'),
+                          load('children_right'), load('value'), load('roots'),
+                          meta['depth'], meta.get('scale'), meta.get('offset', 0.0))
+
+
+def compile_model(model):
+    """Return the compiled form of a fitted sklearn tree ensemble or linear model."""
+    if hasattr(model, 'coef_'):
+        return CompiledLinear.from_sklearn(model)
+    return CompiledForest.from_sklearn(model)
+
+
+def default_grid_axes(settings=None):
+    """Return the (reaction_time, accuracy, lives_lost) axes used for lookup grids."""
+    max_lives = settings.ship_limit + 1 if settings is not None else 4
+    return (np.linspace(0.0, 3.0, 61),  # Reaction time in seconds
+            np.linspace(0.0, 1.0, 51),  # Accuracy
+            np.arange(0, max_lives + 1, dtype=np.float64))  # Lives lost
+
+
+def check_compiled_model(model, compiled, X, tolerance, metric='max'):
+    """Return the max or mean prediction difference, raising if it exceeds tolerance."""
+    X = np.asarray(X, dtype=np.float64)
+    expected = np.asarray(model.predict(X), dtype=np.float64)
+    differences = np.abs(compiled.predict(X) - expected)
+    error = float(getattr(np, metric)(differences)) if len(X) else 0.0
+    if error > tolerance:
+        raise ValueError(
+            f"Compiled {compiled.kind} differs from the model by a {metric} of "
+            f"{error:.6f} (tolerance {tolerance}).")
+    return error
@@ -0,0 +1,433 @@
+"""Serve difficulty predictions to many game sessions from one copy of the model.
+
+Every game normally loads its own model and predicts one row at a time. When
+many headless sessions share a machine, that multiplies the model's memory
+and pays the per-call overhead of predict() once per row. Run one service
+instead:
+
+    python difficulty_service.py --socket difficulty.sock
+
+and point the games at it with Settings.difficulty_service, or with
+simulate.py and sim_farm.py --service. The service collects the requests that
+arrive within a short window and predicts them in one call. A game that
+can't reach the service, or loses it, loads the model and predicts locally.
+
+Requests and replies are fixed binary records, not pickles, so nothing a
+client sends is ever executed.
+"""
+import argparse
+import math
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+from functools import partial
+
+# A request is a count of features followed by the features; a reply is the
+# prediction, NaN if there isn't one.
+REQUEST_HEADER = struct.Struct('<H')
+REPLY = struct.Struct('<d')
+
+
+def encode_request(features):
+    """Return the bytes that ask the service to predict one feature snapshot."""
+    return struct.pack(f'<H{len(features)}d', len(features), *features)
+
+
+def _distribution(values, scale=1.0):
+    """Return the median, 95th percentile and maximum of values, times scale."""
+    values = sorted(values)
+    if not values:
+        return 0.0, 0.0, 0.0
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return values[len(values) // 2] * scale, p95 * scale, values[-1] * scale
+
+
+def _histogram(sizes):
+    """Return counts of batch sizes in power-of-two buckets: '1', '2-3', '4-7', ..."""
+    counts = {}
+    for size in sizes:
+        low = 1 << (size.bit_length() - 1)
+        label = '1' if low == 1 else f'{low}-{2 * low - 1}'
+        counts[label] = counts.get(label, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: int(item[0].split('-')[0])))
+
+
+class _SessionHandler(socketserver.StreamRequestHandler):
+    """Queue each request a game session sends; replies go back on the same socket."""
+
+    def handle(self):
+        service = self.server.service
+        with service.lock:
+            service.sessions += 1
+            service.connected += 1
+            service.session_sockets.add(self.request)
+        reply = partial(_send_reply, self.request)
+        try:
+            while True:
+                header = self.rfile.read(REQUEST_HEADER.size)
+                if len(header) < REQUEST_HEADER.size:
+                    return  # The session closed
+                (count,) = REQUEST_HEADER.unpack(header)
+                body = self.rfile.read(8 * count)
+                if len(body) < 8 * count:
+                    return
+                service.request(struct.unpack(f'<{count}d', body), reply)
+        finally:
+            with service.lock:
+                service.connected -= 1
+                service.session_sockets.discard(self.request)
+
+
+def _send_reply(sock, prediction):
+    """Send a prediction to a session."""
+    sock.sendall(REPLY.pack(math.nan if prediction is None else prediction))
+
+
+class DifficultyService:
+    """A class to batch prediction requests from many games into single predict calls.
+
+    Requests wait in a queue. The batching thread takes the oldest, gathers
+    whatever else arrives within window seconds of it, up to max_batch, and
+    predicts them all in one call. Sessions keep one request in flight, so
+    a batch holding one from every connected session goes without waiting.
+    Each result is handed to its request's reply callback, so callers never
+    wait. Games in other processes reach the queue through serve(); code in
+    this process can call request() directly.
+    """
+
+    def __init__(self, model, window=0.002, max_batch=64, stats_window=4096):
+        """Store the model and start the batching thread."""
+        self.model = model
+        self.window = window
+        self.max_batch = max_batch
+
+        # (features, reply, time queued) per request; None stops the batching thread.
+        self._requests = queue.SimpleQueue()
+        self._server = None
+        self.address = None
+
+        # Service statistics, over the last stats_window batches and requests.
+        self.requests = 0
+        self.batches = 0
+        self.lock = threading.Lock()  # Guards the session counts, which every connection updates
+        self.sessions = 0
+        self.connected = 0  # Sessions connected right now
+        self.session_sockets = set()  # Their sockets, so close() can hang up on them
+        self.model_swaps = 0
+        self.errors = 0
+        self.batch_sizes = deque(maxlen=stats_window)
+        self.predict_times = deque(maxlen=stats_window)
+        self.latencies = deque(maxlen=stats_window)  # From queued to answered
+
+        self._thread = threading.Thread(target=self._run, name="difficulty-batcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def request(self, features, reply):
+        """Queue a feature snapshot; reply(prediction) is called from the batching thread."""
+        self._requests.put((features, reply, time.perf_counter()))
+
+    def set_model(self, model, version=None):
+        """Use model for every batch from now on; takes ModelWatcher's arguments."""
+        self.model = model
+        self.model_swaps += 1
+
+    def serve(self, address):
+        """Accept game sessions on a Unix socket at address, in the background."""
+        if os.path.exists(address):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(address)
+            except OSError:
+                os.remove(address)  # Left behind by a service that didn't shut down
+            else:
+                raise OSError(f"A difficulty service is already running at {address}")
+            finally:
+                probe.close()
+        self._server = socketserver.ThreadingUnixStreamServer(address, _SessionHandler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.address = address
+        threading.Thread(target=self._server.serve_forever, name="difficulty-server",
+                         daemon=True).start()
+
+    def close(self):
+        """Stop accepting sessions, answer the queued requests, then hang up on every session.
+
+        Sessions see their connection end and go on predicting locally.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            os.remove(self.address)
+            self._server = None
+        self._requests.put(None)
+        self._thread.join()
+        with self.lock:
+            sockets = list(self.session_sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already gone
+
+    def report(self):
+        """Return a dictionary of service statistics."""
+        sizes = list(self.batch_sizes)
+        batch_p50, batch_p95, batch_max = _distribution(sizes)
+        latency_p50, latency_p95, latency_max = _distribution(self.latencies, 1000)
+        predict_p50, predict_p95, _ = _distribution(self.predict_times, 1000)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'sessions': self.sessions,
+            'model_swaps': self.model_swaps,
+            'errors': self.errors,
+            'batch_mean': sum(sizes) / len(sizes) if sizes else 0.0,
+            'batch_p50': batch_p50,
+            'batch_p95': batch_p95,
+            'batch_max': batch_max,
+            'batch_histogram': _histogram(sizes),
+            'predict_ms_p50': predict_p50,
+            'predict_ms_p95': predict_p95,
+            'latency_ms_p50': latency_p50,
+            'latency_ms_p95': latency_p95,
+            'latency_ms_max': latency_max,
+        }
+
+    def _run(self):
+        """Predict batches of queued requests until closed."""
+        closing = False
+        while not closing:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            # Wait out the rest of the window; if the oldest request has already
+            # waited that long, take only what's queued.
+            deadline = first[2] + self.window
+            while len(batch) < min(self.max_batch, self.connected or self.max_batch):
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        item = self._requests.get(timeout=remaining)
+                    else:
+                        item = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            start = time.perf_counter()
+            model = self.model
+            try:
+                predictions = [float(p) for p in
+                               model.predict([features for features, _, _ in batch])]
+            except Exception:
+                # A session sent the wrong number of features, or the model is broken;
+                # nobody in the batch gets an answer, but the service keeps going.
+                self.errors += 1
+                predictions = [None] * len(batch)
+            self.predict_times.append(time.perf_counter() - start)
+            self.batch_sizes.append(len(batch))
+            self.batches += 1
+            self.requests += len(batch)
+
+            for (_, reply, queued), prediction in zip(batch, predictions):
+                try:
+                    reply(prediction)
+                except OSError:
+                    pass  # The session has gone
+                self.latencies.append(time.perf_counter() - queued)
+
+
+class DifficultyClient:
+    """A class to get predictions from a difficulty service, with DifficultyWorker's interface.
+
+    One request is in flight at a time. Snapshots submitted while it is
+    replace each other and the newest is sent with the reply, as the worker
+    coalesces them. If the connection drops, or a request goes unanswered
+    for timeout seconds, every call goes to fallback, a local
+    DifficultyWorker, and on_lost is called once so the game can load a
+    model for it. Raises OSError if there's no service at address.
+    """
+
+    def __init__(self, address, fallback, on_lost=None, timeout=1.0, latency_window=256):
+        """Connect to the service and start the thread that receives replies."""
+        self.address = address
+        self.fallback = fallback
+        self.on_lost = on_lost
+        self.timeout = timeout
+        self.lost = False
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(address)
+        except OSError:
+            self._sock.close()
+            raise
+        self._rfile = self._sock.makefile('rb')
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._sent_at = None  # When the request in flight was sent, or None
+        self._closing = False
+
+        # The newest prediction, paired with a counter that changes with every result.
+        self._latest = (None, 0)
+
+        # Client statistics; latencies are round trips.
+        self.requests = 0
+        self.predictions = 0
+        self.skipped = 0
+        self.latencies = deque(maxlen=latency_window)
+
+        self._thread = threading.Thread(target=self._receive, name="difficulty-client",
+                                        daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self):
+        """Return True if a prediction can be requested."""
+        return self.fallback.ready if self.lost else True
+
+    def submit(self, features):
+        """Request a prediction for a feature snapshot without waiting for it."""
+        if not self.lost:
+            with self._lock:
+                self.requests += 1
+                if self._sent_at is None:
+                    self._send(features)
+                    return
+                if self._pending is not None:
+                    self.skipped += 1  # Replaced before it was sent
+                self._pending = features
+                # A service that stops answering is as good as gone.
+                hung = time.perf_counter() - self._sent_at > self.timeout
+            if not hung:
+                return
+            self._lose()
+        self.fallback.submit(features)
+
+    def set_model(self, model):
+        """Give the fallback worker a model; the service has its own."""
+        self.fallback.set_model(model)
+
+    def latest(self):
+        """Return the newest prediction and its version, or None before the first one."""
+        return self.fallback.latest() if self.lost else self._latest
+
+    def close(self):
+        """Disconnect from the service and stop the fallback worker."""
+        self._closing = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)  # Wakes the receiving thread
+        except OSError:
+            pass
+        self._thread.join()
+        self._sock.close()
+        self.fallback.close()
+
+    def report(self):
+        """Return a dictionary of client statistics, or the fallback's once the service is lost."""
+        if self.lost:
+            report = self.fallback.report()
+        else:
+            p50, p95, worst = _distribution(self.latencies, 1000)
+            report = {
+                'requests': self.requests,
+                'predictions': self.predictions,
+                'skipped': self.skipped,
+                'latency_ms_p50': p50,
+                'latency_ms_p95': p95,
+                'latency_ms_max': worst,
+            }
+        report['service'] = self.address
+        report['service_lost'] = self.lost
+        return report
+
+    def _send(self, features):
+        """Send a request; called with the lock held."""
+        self._sent_at = time.perf_counter()
+        try:
+            self._sock.sendall(encode_request(features))
+        except OSError:
+            pass  # The receiving thread sees the connection drop and falls back
+
+    def _receive(self):
+        """Store each reply and send the newest waiting snapshot, until the connection ends."""
+        try:
+            while True:
+                data = self._rfile.read(REPLY.size)
+                if len(data) < REPLY.size:
+                    break
+                (prediction,) = REPLY.unpack(data)
+                with self._lock:
+                    self.latencies.append(time.perf_counter() - self._sent_at)
+                    self._sent_at = None
+                    if not math.isnan(prediction):
+                        self.predictions += 1
+                        self._latest = (prediction, self.predictions)
+                    if self._pending is not None:
+                        features, self._pending = self._pending, None
+                        self._send(features)
+        except OSError:
+            pass
+        if not self._closing:
+            self._lose()
+
+    def _lose(self):
+        """Hang up and hand every call to the fallback worker, once."""
+        with self._lock:
+            if self.lost:
+                return
+            self.lost = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)  # Ends the receiving thread
+        except OSError:
+            pass
+        if self.on_lost is not None:
+            self.on_lost()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--socket', default='difficulty.sock', help="Unix socket to listen on.")
+    parser.add_argument('--window-ms', type=float, default=2.0,
+                        help="How long a request waits for others to batch with it.")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--report-every', type=float, default=10.0,
+                        help="Seconds between statistics lines; 0 for none.")
+    args = parser.parse_args()
+
+    from settings import Settings
+    from model_watcher import ModelWatcher, load_difficulty_model
+
+    settings = Settings()
+    model, version = load_difficulty_model(settings)
+    service = DifficultyService(model, window=args.window_ms / 1000, max_batch=args.max_batch)
+    watcher = None
+    if settings.model_poll_interval:
+        watcher = ModelWatcher(settings.models_dir, service.set_model,
+                               settings.model_poll_interval, version)
+    service.serve(args.socket)
+    print(f"Serving difficulty predictions on {args.socket}. Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(args.report_every or 3600)
+            if args.report_every:
+                print(service.report())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.close()
+        service.close()
+        print(service.report())
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+
+
+class DifficultyWorker:
+    """A class to run difficulty predictions off the render thread."""
+
+    def __init__(self, model, latency_window=256):
+        """Store the model and start the inference thread."""
+        self.model = model
+
+        # Only the newest feature snapshot is kept; older ones are coalesced.
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+
+        # The newest prediction, paired with a counter that changes with every result.
+        self._latest = (None, 0)
+
+        # Worker statistics.
+        self.requests = 0
+        self.predictions = 0
+        self.model_swaps = 0
+        self.skipped = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=latency_window)
+
+        self._thread = threading.Thread(target=self._run, name="difficulty-worker",
+                                        daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self):
+        """Return True once there is a model to predict with."""
+        return self.model is not None
+
+    def submit(self, features):
+        """Request a prediction for a feature snapshot without waiting for it."""
+        with self._lock:
+            self.requests += 1
+            if self._pending is not None:
+                self.skipped += 1  # Replaced before the worker got to it
+            self._pending = features
+            self._wakeup.notify()
+
+    def set_model(self, model):
+        """Use model for every prediction from now on."""
+        # A single assignment, so a prediction in progress finishes with the old model.
+        self.model = model
+        self.model_swaps += 1
+
+    def latest(self):
+        """Return the newest prediction and its version, or None before the first one."""
+        return self._latest
+
+    def close(self):
+        """Stop the inference thread."""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+
+    def report(self):
+        """Return a dictionary of worker statistics."""
+        latencies = sorted(self.latencies)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            worst = latencies[-1]
+        else:
+            p50 = p95 = worst = 0.0
+        return {
+            'requests': self.requests,
+            'predictions': self.predictions,
+            'skipped': self.skipped,
+            'model_swaps': self.model_swaps,
+            'errors': self.errors,
+            'latency_ms_p50': p50 * 1000,
+            'latency_ms_p95': p95 * 1000,
+            'latency_ms_max': worst * 1000,
+        }
+
+    def _run(self):
+        """Predict the newest pending snapshot until the worker is closed."""
+        while True:
+            with self._lock:
+                while self._pending is None and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                features = self._pending
+                self._pending = None
+
+            start = time.perf_counter()
+            model = self.model
+            try:
+                prediction = model.predict([features])[0]
+            except Exception:
+                # A broken model or snapshot loses this prediction, not the thread;
+                # the last good prediction stays in place.
+                self.errors += 1
+                continue
+            self.latencies.append(time.perf_counter() - start)
+
+            self.predictions += 1
+            self._latest = (prediction, self.predictions)
@@ -0,0 +1,298 @@
+"""Stream player metrics into a compact per-window training matrix.
+
+The metrics log has one row per frame, mostly incomplete or repeated. This
+reads it in fixed-size chunks, from a CSV or a binary MetricsStore, and
+summarizes each chunk in a worker process:
+
+- rows without accuracy, lives or alien speed are dropped
+- rows without a reaction time are dropped, or filled in with --impute
+- consecutive duplicate rows are collapsed into one weighted row
+- rows are grouped into windows of --window frames per session
+
+Each window gets the latest reaction time, accuracy and lives lost (the
+features the game predicts from) and the mean alien speed as the target. It
+also gets the mean accuracy, the 50th and 90th percentile reaction times and
+lives lost per second.
+
+Workers return partial sums and reaction-time histograms that merge exactly, so
+a window split across two chunks comes out the same as one that isn't.
+Chunks are merged in order and finished windows are written straight away, so
+memory use depends on the chunk size and worker count, never the file size.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource  # Not on Windows, where peak memory isn't reported
+except ImportError:
+    resource = None
+
+from metrics_store import MetricsStore, RECORD_DTYPE
+
+# Reaction-time histogram bin edges in seconds; the last bin also holds slower times.
+REACTION_BINS = np.linspace(0.0, 5.0, 251)
+
+# Partial sums kept per (session, window) while chunks are merged.
+_SUMS = ['frames', 'unique_rows', 'accuracy_sum', 'speed_sum', 'lives_increase']
+_LAST = ['last_frame', 'reaction_time', 'accuracy', 'lives_lost']
+
+OUTPUT_COLUMNS = ['session', 'window', 'frames', 'reaction_time', 'accuracy', 'lives_lost',
+                  'accuracy_mean', 'reaction_p50', 'reaction_p90', 'lives_lost_rate',
+                  'alien_speed']
+
+
+def plan_chunks(path, chunk_rows):
+    """Yield the chunks of a metrics file as tasks for summarize_chunk."""
+    if path.endswith('.bin'):
+        records = len(MetricsStore(path))
+        for start in range(0, records, chunk_rows):
+            yield ('bin', path, start, min(start + chunk_rows, records))
+    else:
+        first_row = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield ('csv', chunk, first_row)
+            first_row += len(chunk)
+
+
+def _load_chunk(task):
+    """Return a chunk as a DataFrame with session and frame columns."""
+    if task[0] == 'bin':
+        _, path, start, stop = task
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+                            offset=start * RECORD_DTYPE.itemsize, shape=(stop - start,))
+        return pd.DataFrame({name: np.asarray(records[name]) for name in RECORD_DTYPE.names})
+    _, df, first_row = task
+    if 'session' not in df.columns:
+        df['session'] = 0
+    if 'frame' not in df.columns:
+        df['frame'] = np.arange(first_row, first_row + len(df))  # A CSV row is a frame
+    return df
+
+
+def summarize_chunk(task, window, impute=None):
+    """Return the partial window sums of one chunk, and its edge rows for merging."""
+    df = _load_chunk(task)
+    rows_in = len(df)
+    df = df.dropna(subset=['accuracy', 'lives_lost', 'alien_speed'])
+    if impute is None:
+        df = df.dropna(subset=['reaction_time'])
+    else:
+        df = df.fillna({'reaction_time': impute})
+
+    session = df['session'].to_numpy(np.int64)
+    frame = df['frame'].to_numpy(np.int64)
+    reaction = df['reaction_time'].to_numpy(np.float64)
+    accuracy = df['accuracy'].to_numpy(np.float64)
+    lives = df['lives_lost'].to_numpy(np.int64)
+    speed = df['alien_speed'].to_numpy(np.float64)
+    win = frame // window
+    result = {'rows_in': rows_in, 'rows_complete': len(df), 'partials': None,
+              'hist': None, 'first': None, 'last': None}
+    if not len(df):
+        return result
+
+    # Lives lost during the chunk: increases between consecutive rows of a session.
+    increase = np.zeros(len(df), dtype=np.int64)
+    step = np.diff(lives)
+    increase[1:] = np.where((session[1:] == session[:-1]) & (step > 0), step, 0)
+
+    # Collapse runs of identical rows within a window into one weighted row.
+    columns = (session, win, reaction, accuracy, lives, speed)
+    new_run = np.ones(len(df), dtype=bool)
+    new_run[1:] = np.any([c[1:] != c[:-1] for c in columns], axis=0)
+    runs = np.flatnonzero(new_run)
+    weight = np.diff(np.append(runs, len(df)))
+    run_increase = np.add.reduceat(increase, runs)
+    run_end = np.append(runs[1:], len(df)) - 1
+
+    # Then group the runs by (session, window).
+    run_session, run_win = session[runs], win[runs]
+    new_group = np.ones(len(runs), dtype=bool)
+    new_group[1:] = (run_session[1:] != run_session[:-1]) | (run_win[1:] != run_win[:-1])
+    groups = np.flatnonzero(new_group)
+    group_id = np.cumsum(new_group) - 1
+    last_run = np.append(groups[1:], len(runs)) - 1
+    last_row = run_end[last_run]
+
+    partials = pd.DataFrame({
+        'session': run_session[groups],
+        'window': run_win[groups],
+        'frames': np.add.reduceat(weight, groups),
+        'unique_rows': np.diff(np.append(groups, len(runs))),
+        'accuracy_sum': np.add.reduceat(accuracy[runs] * weight, groups),
+        'speed_sum': np.add.reduceat(speed[runs] * weight, groups),
+        'lives_increase': np.add.reduceat(run_increase, groups),
+        'last_frame': frame[last_row],
+        'reaction_time': reaction[last_row],
+        'accuracy': accuracy[last_row],
+        'lives_lost': lives[last_row],
+    })
+
+    bins = len(REACTION_BINS) - 1
+    bin_index = np.clip(np.searchsorted(REACTION_BINS, reaction[runs], side='right') - 1,
+                        0, bins - 1)
+    hist = np.bincount(group_id * bins + bin_index, weights=weight,
+                       minlength=len(groups) * bins).reshape(len(groups), bins)
+
+    def edge(row):
+        return {'session': int(session[row]), 'window': int(win[row]),
+                'lives_lost': int(lives[row]),
+                'key': tuple(float(c[row]) for c in columns)}
+
+    result.update(partials=partials, hist=hist, first=edge(0), last=edge(len(df) - 1))
+    return result
+
+
+def _percentile(hist, q):
+    """Return the q-th percentile (0-1) of a reaction-time histogram."""
+    cumulative = np.cumsum(hist)
+    if not cumulative[-1]:
+        return float('nan')
+    target = q * cumulative[-1]
+    i = int(np.searchsorted(cumulative, target))
+    below = cumulative[i - 1] if i else 0.0
+    fraction = (target - below) / hist[i] if hist[i] else 0.0
+    return float(REACTION_BINS[i] + fraction * (REACTION_BINS[i + 1] - REACTION_BINS[i]))
+
+
+class _WindowMerger:
+    """Merges chunk summaries in order and writes out windows once they're complete."""
+
+    def __init__(self, output_path, fps):
+        self.output_path = output_path
+        self.fps = fps
+        self.open = {}  # (session, window) -> [sums, last values, histogram]
+        self.previous_last = None
+        self.rows_in = self.rows_complete = self.unique_rows = self.windows = 0
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    def add(self, result):
+        """Merge one chunk's summary and write the windows it completed."""
+        self.rows_in += result['rows_in']
+        self.rows_complete += result['rows_complete']
+        if result['partials'] is None:
+            return
+        first, last = result['first'], result['last']
+        partials = result['partials']
+
+        # Repair what the chunk boundary split: a duplicate run, and a lives change.
+        previous = self.previous_last
+        adjust = None
+        if previous is not None and previous['session'] == first['session']:
+            same_window = previous['window'] == first['window']
+            adjust = {'lives_increase': max(0, first['lives_lost'] - previous['lives_lost']),
+                      'unique_rows': -1 if same_window and previous['key'] == first['key']
+                      else 0}
+        self.previous_last = last
+
+        for i, row in enumerate(partials.itertuples(index=False)):
+            key = (row.session, row.window)
+            sums = {name: getattr(row, name) for name in _SUMS}
+            if i == 0 and adjust is not None:
+                for name, value in adjust.items():
+                    sums[name] += value
+            entry = self.open.get(key)
+            if entry is None:
+                self.open[key] = [sums, {name: getattr(row, name) for name in _LAST},
+                                  result['hist'][i].copy()]
+                continue
+            for name, value in sums.items():
+                entry[0][name] += value
+            if row.last_frame >= entry[1]['last_frame']:
+                entry[1] = {name: getattr(row, name) for name in _LAST}
+            entry[2] += result['hist'][i]
+
+        # Every window but the one the chunk ended in is complete.
+        self._write([key for key in self.open if key != (last['session'], last['window'])])
+
+    def finish(self):
+        """Write the windows still open."""
+        self._write(list(self.open))
+
+    def _write(self, keys):
+        """Turn finished windows into output rows and append them to the output file."""
+        if not keys:
+            return
+        rows = []
+        for key in sorted(keys):
+            sums, last, hist = self.open.pop(key)
+            frames = sums['frames']
+            self.unique_rows += sums['unique_rows']
+            rows.append((key[0], key[1], frames, last['reaction_time'], last['accuracy'],
+                         last['lives_lost'], sums['accuracy_sum'] / frames,
+                         _percentile(hist, 0.5), _percentile(hist, 0.9),
+                         sums['lives_increase'] / frames * self.fps,
+                         sums['speed_sum'] / frames))
+        pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_csv(
+            self.output_path, mode='a', header=not self.windows, index=False)
+        self.windows += len(rows)
+
+
+def _peak_rss_mb():
+    """Return this process's peak memory in MB, or None where it can't be read."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_training_matrix(metrics_path, output_path, window=60, chunk_rows=100000,
+                          workers=None, impute=None, fps=60):
+    """Summarize a metrics file into per-window training rows; return pipeline statistics."""
+    workers = os.cpu_count() if workers is None else workers
+    merger = _WindowMerger(output_path, fps)
+    start = time.perf_counter()
+
+    if workers:
+        # Only a few chunks are in flight at once, which bounds memory.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for task in plan_chunks(metrics_path, chunk_rows):
+                in_flight.append(pool.submit(summarize_chunk, task, window, impute))
+                if len(in_flight) >= 2 * workers:
+                    merger.add(in_flight.popleft().result())
+            while in_flight:
+                merger.add(in_flight.popleft().result())
+    else:
+        for task in plan_chunks(metrics_path, chunk_rows):
+            merger.add(summarize_chunk(task, window, impute))
+    merger.finish()
+
+    return {
+        'rows_in': merger.rows_in,
+        'rows_complete': merger.rows_complete,
+        'rows_unique': merger.unique_rows,
+        'windows': merger.windows,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--metrics', default='player_metrics.csv',
+                        help="Metrics CSV, or a binary store ending in .bin.")
+    parser.add_argument('--output', default='training_matrix.csv')
+    parser.add_argument('--window', type=int, default=60, help="Frames per window.")
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per core; 0 runs in-process).")
+    parser.add_argument('--impute', type=float, default=None, metavar='SECONDS',
+                        help="Fill missing reaction times with this value instead of "
+                             "dropping the rows.")
+    args = parser.parse_args()
+
+    stats = build_training_matrix(args.metrics, args.output, args.window, args.chunk_rows,
+                                  args.workers, args.impute)
+    peak = stats['peak_rss_mb']
+    memory = '' if peak is None else f" (peak RSS {peak:.0f} MB)"
+    print(f"{stats['rows_in']} rows read, {stats['rows_complete']} complete, "
+          f"{stats['rows_unique']} after collapsing repeats, "
+          f"{stats['windows']} windows written to {args.output} "
+          f"in {stats['seconds']:.2f}s{memory}.")
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+def _round(values):
+    """Round half away from zero, the way pygame stores floats in a Rect."""
+    return np.trunc(values + np.copysign(0.5, values))
+
+
+class Fleet:
+    """A class to manage the whole alien fleet as arrays instead of sprites."""
+
+    def __init__(self, ai_game, seed=None, capacity=64):
+        """Load the shared alien image and allocate the fleet arrays."""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.rng = np.random.default_rng(seed)
+
+        # Every alien shares one image, resized for better visibility.
+        self.image = ai_game.assets.image('alien.png', (50, 50))
+        self.width, self.height = self.image.get_size()
+
+        # Chance per frame that an alien drops by its vertical speed; matches
+        # random.randint(0, 100) < 5 in the original Alien.update().
+        self.drop_chance = 5 / 101
+
+        # One slot per alien. x is the exact horizontal position; rect_x and y
+        # are the whole-pixel rect position used for drawing and collisions.
+        self.x = np.zeros(capacity)
+        self.rect_x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.vertical_speed = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0  # Slots in use, alive or not
+        self.alive_count = 0
+        self.version = 0  # Changes whenever any alien moves or is added
+        self.step_dx = 0.0  # How far every alien moved sideways in the last update
+
+    def __len__(self):
+        """Return the number of aliens still alive."""
+        return self.alive_count
+
+    def empty(self):
+        """Remove every alien."""
+        self.alive[:self.count] = False
+        self.count = 0
+        self.alive_count = 0
+        self.version += 1
+
+    def spawn(self, xs, ys):
+        """Add aliens with their top-left corners at the given positions."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.int64)
+        n = xs.size
+        self._reserve(self.count + n)
+
+        new = slice(self.count, self.count + n)
+        self.x[new] = xs
+        self.rect_x[new] = _round(xs)
+        self.y[new] = ys
+        # Set a random vertical speed to make movements more dynamic
+        self.vertical_speed[new] = self.rng.uniform(0.5, 1.5, n)
+        self.alive[new] = True
+        self.count += n
+        self.alive_count += n
+        self.version += 1
+        self.step_dx = 0.0  # New aliens have nowhere to be drawn back towards
+
+    def update(self):
+        """Move every alien sideways, and drop a random few by their vertical speed."""
+        n = self.count
+        self.step_dx = self.settings.alien_speed * self.settings.fleet_direction
+        self.x[:n] += self.step_dx
+        self.rect_x[:n] = _round(self.x[:n])
+
+        drops = self.rng.random(n) < self.drop_chance
+        self.y[:n][drops] = _round(self.y[:n][drops] + self.vertical_speed[:n][drops])
+        self.version += 1
+
+    def check_edges(self):
+        """Return True if any alien is at the edge of the screen."""
+        n = self.count
+        rect_x = self.rect_x[:n]
+        at_edge = (rect_x + self.width >= self.screen.get_width()) | (rect_x <= 0)
+        return bool(np.any(at_edge & self.alive[:n]))
+
+    def drop(self, distance):
+        """Move the whole fleet down."""
+        self.y[:self.count] += distance
+        self.version += 1
+
+    def reached_bottom(self, bottom):
+        """Return True if any alien has reached the given y coordinate."""
+        n = self.count
+        return bool(np.any((self.y[:n] + self.height >= bottom) & self.alive[:n]))
+
+    def kill(self, indices):
+        """Remove the aliens at the given indices."""
+        self.alive[indices] = False
+        self.alive_count = int(np.count_nonzero(self.alive[:self.count]))
+        if not self.alive_count:
+            self.count = 0  # The next fleet reuses the slots from the start
+
+    def positions(self):
+        """Return the x and y arrays of the living aliens' top-left corners."""
+        alive = self.alive[:self.count]
+        return self.rect_x[:self.count][alive], self.y[:self.count][alive]
+
+    def draw(self, surface, behind=0.0):
+        """Blit the shared alien image at every living alien's position.
+
+        behind draws the fleet that fraction of its last sideways step back.
+        Return the list of rects drawn.
+        """
+        xs, ys = self.positions()
+        if behind:
+            xs = _round(xs - behind * self.step_dx).astype(np.int64)
+        return surface.blits([(self.image, pos) for pos in zip(xs.tolist(), ys.tolist())])
+
+    def _reserve(self, size):
+        """Grow the arrays so they can hold at least size aliens."""
+        capacity = self.x.size
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('x', 'rect_x', 'y', 'vertical_speed', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
@@ -1,26 +1,103 @@
+from rolling_stats import RollingWindow
+
+
 class GameStats:
     """Track statistics for Alien Invasion."""
 
     def __init__(self, ai_game):
         """Initialize statistics."""
         self.settings = ai_game.settings
-        self.reaction_times = []  # Initialize reaction times here
         self.shots_fired = 0  # Count total shots fired
         self.shots_hit = 0  # Count total hits
         self.lives_lost = 0  # Track lives lost
         self.powerups_collected = 0  # Count total power-ups collected
 
+        # Recent history in fixed-size ring buffers, so memory and the cost of
+        # the difficulty features stay the same however long a session runs.
+        self.reaction_times = RollingWindow(self.settings.reaction_window, bins=(0.0, 5.0, 100))
+        # One entry per shot: 0 when fired, set to 1 if its bullet hits something.
+        self.recent_shots = RollingWindow(self.settings.shot_window)
+        self.life_lost_frames = RollingWindow(self.settings.ship_limit + 1)
+        self._features = None  # Cached until the next event
+
         self.reset_stats()
 
         # High score should never be reset.
         self.high_score = 0
 
+    def record_shot(self):
+        """Count a bullet fired and return the shot's number, for record_hit."""
+        self.shots_fired += 1
+        self._features = None
+        return self.recent_shots.append(0)
+
+    def record_hit(self, shot):
+        """Count a bullet hitting aliens; shot is its number from record_shot, or None."""
+        self.shots_hit += 1
+        if shot is not None:
+            self.recent_shots.replace(shot, 1)
+        self._features = None
+
+    def record_reaction(self, seconds):
+        """Add how long the player took to react to something new."""
+        self.reaction_times.append(seconds)
+        self._features = None
+
+    def record_life_lost(self, frame):
+        """Count a life lost on a frame."""
+        self.lives_lost += 1
+        self.life_lost_frames.append(frame)
+        self._features = None
+
+    def windowed_accuracy(self):
+        """Return the fraction of the recent shots that hit, or 0 before the first shot.
+
+        Bullets still in flight count as misses until they hit.
+        """
+        return self.recent_shots.mean() if len(self.recent_shots) else 0
+
+    def metric_features(self):
+        """Return (reaction_time, accuracy, lives_lost), the reaction time None before the first.
+
+        The reaction time is the mean of the recent ones, and the accuracy is
+        over the recent shots. This is what the metrics record and the model predicts from.
+        """
+        if self._features is None:
+            self._features = (self.reaction_times.mean(), self.windowed_accuracy(),
+                              self.lives_lost)
+        return self._features
+
+    def difficulty_features(self):
+        """Return the latest [reaction_time, accuracy, lives_lost] snapshot, or None."""
+        features = self.metric_features()
+        if features[0] is None:
+            return None
+        return list(features)
+
+    def rolling_report(self):
+        """Return the recent reaction times' distribution, accuracy and lives lost."""
+        reactions = self.reaction_times
+        variance = reactions.variance()
+        return {
+            'reactions': len(reactions),
+            'reaction_mean': reactions.mean(),
+            'reaction_std': None if variance is None else variance ** 0.5,
+            'reaction_p50': reactions.percentile(50),
+            'reaction_p90': reactions.percentile(90),
+            'accuracy': self.windowed_accuracy(),
+            'lives_lost': self.lives_lost,
+            'last_life_lost_frame': self.life_lost_frames.last(),
+        }
+
     def reset_stats(self):
         """Initialize statistics that can change during the game."""
         self.ships_left = self.settings.ship_limit
         self.score = 0
         self.level = 1
         self.reaction_times.clear()  # Clear reaction times
+        self.recent_shots.clear()
+        self.life_lost_frames.clear()
+        self._features = None
         self.shots_fired = 0
         self.shots_hit = 0
         self.lives_lost = 0
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class GlyphAtlas:
+    """A class to compose text from glyphs that are rasterized only once."""
+
+    def __init__(self, font, color, background, charset="0123456789,-", labels=(),
+                 cache_size=32):
+        """Render every glyph and label up front."""
+        self.font = font
+        self.color = color
+        self.background = background
+        self.height = font.get_height()
+
+        # Single characters and whole words, each rendered once.
+        self.glyphs = {}
+        for char in charset:
+            self.glyphs[char] = self._rasterize(char)
+        self.labels = {label: self._rasterize(label) for label in labels}
+
+        # Recently composed strings; the oldest is dropped when the cache is full.
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text):
+        """Return a surface showing text, like font.render with this atlas's colors.
+
+        The surface is shared with later calls for the same text, so don't draw on it.
+        """
+        surface = self._cache.get(text)
+        if surface is not None:
+            self._cache.move_to_end(text)
+            self.hits += 1
+            return surface
+        self.misses += 1
+
+        surface = self.labels.get(text)
+        if surface is None:
+            surface = self._compose(text)
+        self._cache[text] = surface
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return surface
+
+    def _compose(self, text):
+        """Blit the glyphs of text side by side onto a new surface."""
+        placed = []
+        x = 0
+        full_height = True
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                glyph = self.glyphs[char] = self._rasterize(char)
+            placed.append((glyph, (x, 0)))
+            x += glyph.get_width()
+            full_height = full_height and glyph.get_height() == self.height
+        if not placed:
+            return self._rasterize(text)
+
+        # Made in the glyphs' pixel format, so no conversion is needed afterwards.
+        surface = pygame.Surface((x, self.height), 0, placed[0][0])
+        if not full_height:
+            surface.fill(self.background)
+        surface.blits(placed, False)
+        return surface
+
+    def _rasterize(self, text):
+        """Render text with the font."""
+        return self._convert(self.font.render(text, True, self.color, self.background))
+
+    def _convert(self, surface):
+        """Match the display's pixel format when there is a display."""
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert()
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class MetricsSink:
+    """A class to buffer player metrics and write them in the background."""
+
+    def __init__(self, path, columns, buffer_size=10000, batch_size=600,
+                 flush_interval=2.0, writer=None):
+        """Initialize the buffer and start the writer thread.
+
+        writer, if given, is called with each batch of rows instead of
+        appending them to the CSV file at path.
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.writer = writer
+        self.buffer_size = buffer_size  # Maximum rows held in memory
+        self.batch_size = batch_size  # Flush as soon as this many rows are waiting
+        self.flush_interval = flush_interval  # Flush at least this often (seconds), if set
+
+        # Rows waiting to be written; the oldest rows are dropped when full.
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_requested = False
+        self._closed = False
+
+        # pandas is slow to import, so the writer thread imports it, and
+        # sets ready once it can write.
+        self._pandas = None
+        self.ready = threading.Event()
+        self.warmup_time = 0.0
+
+        # Writer statistics.
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flush_count = 0
+        self.flush_time_total = 0.0
+        self.flush_time_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="metrics-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def record(self, row):
+        """Queue one row of metrics. Never touches the disk."""
+        self.record_many((row,))
+
+    def record_many(self, rows):
+        """Queue several rows of metrics at once."""
+        with self._lock:
+            for row in rows:
+                if len(self._rows) >= self.buffer_size:
+                    self._rows.popleft()
+                    self.rows_dropped += 1
+                self._rows.append(row)
+            if len(self._rows) >= self.batch_size:
+                self._wakeup.notify_all()
+
+    def request_flush(self):
+        """Ask the writer to write every queued row soon, without waiting for it."""
+        with self._lock:
+            self._flush_requested = True
+            self._wakeup.notify_all()
+
+    def flush(self, timeout=None):
+        """Write every queued row now and wait for the writer to finish."""
+        with self._lock:
+            self._flush_requested = True
+            self._wakeup.notify_all()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while (self._rows or self._flush_requested) and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._wakeup.wait(remaining)
+
+    def close(self):
+        """Flush the remaining rows and stop the writer thread."""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        self._thread.join()
+
+    def report(self):
+        """Return a dictionary of writer statistics."""
+        with self._lock:
+            pending = len(self._rows)
+        mean_flush = self.flush_time_total / self.flush_count if self.flush_count else 0.0
+        return {
+            'rows_written': self.rows_written,
+            'rows_dropped': self.rows_dropped,
+            'rows_pending': pending,
+            'flushes': self.flush_count,
+            'flush_ms_mean': mean_flush * 1000,
+            'flush_ms_max': self.flush_time_max * 1000,
+        }
+
+    def _run(self):
+        """Wait for a full batch, a flush request or the flush interval (if any), then write."""
+        start = time.perf_counter()
+        if self.writer is None:
+            import pandas
+            self._pandas = pandas
+        self.warmup_time = time.perf_counter() - start
+        self.ready.set()
+
+        while True:
+            with self._lock:
+                if not (self._closed or self._flush_requested
+                        or len(self._rows) >= self.batch_size):
+                    self._wakeup.wait(self.flush_interval)
+                batch = list(self._rows)
+                self._rows.clear()
+                closing = self._closed
+
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError:
+                    self.rows_dropped += len(batch)
+
+            with self._lock:
+                if not self._rows:
+                    self._flush_requested = False
+                self._wakeup.notify_all()
+            if closing:
+                return
+
+    def _write(self, batch):
+        """Append a batch of rows to the CSV file, or pass it to the writer."""
+        start = time.perf_counter()
+        if self.writer is not None:
+            self.writer(batch)
+        else:
+            df = self._pandas.DataFrame(batch, columns=self.columns)
+            df.to_csv(self.path, mode='a', header=not os.path.exists(self.path), index=False)
+        elapsed = time.perf_counter() - start
+
+        self.rows_written += len(batch)
+        self.flush_count += 1
+        self.flush_time_total += elapsed
+        self.flush_time_max = max(self.flush_time_max, elapsed)
@@ -0,0 +1,247 @@
+"""Store player metrics as fixed-size binary records with a session index.
+
+The records file holds nothing but packed records of RECORD_DTYPE. That makes
+it readable with a memory map and extendable by appending bytes. Next to it, a
+small JSON index lists each contiguous run of records ("segment") with its
+session and frame range, so readers can slice out sessions without scanning
+the file.
+
+    python metrics_store.py convert player_metrics.csv player_metrics.bin
+    python metrics_store.py compare player_metrics.csv player_metrics.bin
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+METRIC_COLUMNS = ('reaction_time', 'accuracy', 'lives_lost', 'alien_speed')
+
+# Little-endian and packed, so files are the same on every machine.
+RECORD_DTYPE = np.dtype([
+    ('session', '<u4'),
+    ('frame', '<u4'),
+    ('reaction_time', '<f4'),  # NaN when the player hasn't reacted yet
+    ('accuracy', '<f4'),
+    ('lives_lost', '<i2'),
+    ('alien_speed', '<f4'),
+])
+
+
+class MetricsStore:
+    """A class to append and read player metrics in a memory-mapped binary file."""
+
+    def __init__(self, path):
+        """Open the store at path, creating it if needed, and load its index."""
+        self.path = path
+        self.index_path = path + '.index.json'
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+            if np.dtype([tuple(field) for field in self.index['dtype']]) != RECORD_DTYPE:
+                raise ValueError(f"{path} was written with a different record layout.")
+        else:
+            self.index = {'dtype': [list(field) for field in RECORD_DTYPE.descr],
+                          'records': 0, 'segments': []}
+        self._recovered = False
+
+    def __len__(self):
+        """Return the number of records in the store."""
+        return self.index['records']
+
+    def new_session(self):
+        """Return a session number not used in the store yet."""
+        return max((segment['session'] for segment in self.index['segments']), default=-1) + 1
+
+    def sessions(self):
+        """Return {session: (records, first frame, last frame)} for every session."""
+        sessions = {}
+        for segment in self.index['segments']:
+            count, first, last = sessions.get(segment['session'],
+                                              (0, segment['first_frame'], 0))
+            sessions[segment['session']] = (count + segment['count'],
+                                            min(first, segment['first_frame']),
+                                            max(last, segment['last_frame']))
+        return sessions
+
+    def append(self, records):
+        """Append a structured array of RECORD_DTYPE records and update the index."""
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        if not len(records):
+            return
+        if not self._recovered:
+            self._recover()
+        with open(self.path, 'ab') as f:
+            f.write(records.tobytes())
+
+        # Extend the last segment when it continues the same session.
+        start = self.index['records']
+        for session in np.unique(records['session']):
+            rows = np.flatnonzero(records['session'] == session)
+            # Split wherever the session's records aren't next to each other.
+            for run in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1):
+                self._add_segment(int(session), start + int(run[0]), len(run),
+                                  int(records['frame'][run[0]]), int(records['frame'][run[-1]]))
+        self.index['records'] = start + len(records)
+        self._save_index()
+
+    def append_rows(self, rows, session):
+        """Append rows of (frame, reaction_time, accuracy, lives_lost, alien_speed)."""
+        records = np.empty(len(rows), dtype=RECORD_DTYPE)
+        records['session'] = session
+        for name, values in zip(('frame',) + METRIC_COLUMNS, zip(*rows)):
+            records[name] = np.array(values, dtype=np.float64)  # None becomes NaN
+        self.append(records)
+
+    def records(self):
+        """Return every record as a read-only memory map."""
+        if not len(self):
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(len(self),))
+
+    def read(self, sessions=None, frames=None):
+        """Return the records of the given sessions, optionally within a (first, last) frame range.
+
+        A single matching segment comes back as a view of the memory map;
+        several are copied into one array.
+        """
+        if sessions is None and frames is None:
+            return self.records()
+        wanted = None if sessions is None else set(sessions)
+        records = self.records()
+        parts = []
+        for segment in self.index['segments']:
+            if wanted is not None and segment['session'] not in wanted:
+                continue
+            if frames is not None and (segment['last_frame'] < frames[0]
+                                       or segment['first_frame'] > frames[1]):
+                continue
+            part = records[segment['start']:segment['start'] + segment['count']]
+            if frames is not None:
+                # Frames only increase within a segment.
+                first = np.searchsorted(part['frame'], frames[0], side='left')
+                last = np.searchsorted(part['frame'], frames[1], side='right')
+                part = part[first:last]
+            parts.append(part)
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def _add_segment(self, session, start, count, first_frame, last_frame):
+        """Record a run of records, merging it into the previous segment if it continues it."""
+        segments = self.index['segments']
+        last = segments[-1] if segments else None
+        if (last is not None and last['session'] == session
+                and last['start'] + last['count'] == start
+                and last['last_frame'] <= first_frame):
+            last['count'] += count
+            last['last_frame'] = last_frame
+        else:
+            segments.append({'session': session, 'start': start, 'count': count,
+                             'first_frame': first_frame, 'last_frame': last_frame})
+
+    def _save_index(self):
+        """Replace the index file atomically."""
+        temp = self.index_path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(temp, self.index_path)
+
+    def _recover(self):
+        """Cut off records written after the last index update, such as a partial batch.
+
+        Only writers do this; a reader could otherwise cut off records another
+        process has written but not indexed yet.
+        """
+        self._recovered = True
+        size = self.index['records'] * RECORD_DTYPE.itemsize
+        if os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+
+
+def load_metrics(path, sessions=None):
+    """Return metrics from a .bin store or a CSV file as a pandas DataFrame.
+
+    sessions, if given, keeps only those sessions (CSV files need a session column).
+    """
+    import pandas as pd
+    if path.endswith('.bin'):
+        records = MetricsStore(path).read(sessions)
+        return pd.DataFrame({name: records[name] for name in records.dtype.names})
+    df = pd.read_csv(path)
+    if sessions is not None and 'session' in df.columns:
+        df = df[df['session'].isin(sessions)]
+    return df
+
+
+def convert_csv(csv_path, store_path, session=None, chunksize=100000):
+    """Append a metrics CSV to a store as one session, numbering rows as frames."""
+    import pandas as pd
+    store = MetricsStore(store_path)
+    if session is None:
+        session = store.new_session()
+    frame = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        records = np.empty(len(chunk), dtype=RECORD_DTYPE)
+        records['session'] = session
+        records['frame'] = np.arange(frame, frame + len(chunk))
+        for name in METRIC_COLUMNS:
+            records[name] = pd.to_numeric(chunk[name], errors='coerce')
+        store.append(records)
+        frame += len(chunk)
+    return store
+
+
+def compare(csv_path, store_path, repeats=3):
+    """Print file sizes and load times of the CSV and the binary store."""
+    import pandas as pd
+
+    def best(load):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            load()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    store = MetricsStore(store_path)
+    sessions = sorted(store.sessions())
+    print(f"{'':<28} {'CSV':>12} {'binary':>12}")
+    print(f"{'size (KiB)':<28} {os.path.getsize(csv_path) / 1024:>12.1f} "
+          f"{os.path.getsize(store_path) / 1024:>12.1f}")
+    print(f"{'load all (ms)':<28} {best(lambda: pd.read_csv(csv_path)):>12.1f} "
+          f"{best(lambda: np.array(MetricsStore(store_path).records())):>12.1f}")
+    print(f"{'load as DataFrame (ms)':<28} {best(lambda: load_metrics(csv_path)):>12.1f} "
+          f"{best(lambda: load_metrics(store_path)):>12.1f}")
+    if sessions:
+        last = sessions[-1]
+        print(f"{'one session (ms)':<28} {'':>12} "
+              f"{best(lambda: np.array(MetricsStore(store_path).read([last]))):>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="Append a metrics CSV to a binary store.")
+    convert.add_argument('csv')
+    convert.add_argument('store')
+    convert.add_argument('--session', type=int, default=None)
+    sizes = commands.add_parser('compare', help="Compare sizes and load times.")
+    sizes.add_argument('csv')
+    sizes.add_argument('store')
+    info = commands.add_parser('sessions', help="List the sessions in a store.")
+    info.add_argument('store')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        store = convert_csv(args.csv, args.store, args.session)
+        print(f"{args.store}: {len(store)} records in {len(store.sessions())} session(s).")
+    elif args.command == 'compare':
+        compare(args.csv, args.store)
+    else:
+        for session, (count, first, last) in sorted(MetricsStore(args.store).sessions().items()):
+            print(f"session {session}: {count} records, frames {first}-{last}")
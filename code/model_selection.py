@@ -0,0 +1,176 @@
+"""Pick the difficulty model: the most accurate candidate within a latency budget.
+
+The game asks for a prediction many times a second, so a slightly more
+accurate model that is ten times slower to evaluate is the wrong trade. This
+fits a grid of candidates (random forests of several sizes and depths,
+gradient boosting, linear and ridge regression) in parallel worker processes
+and scores each one on:
+
+- held-out error: MAE and RMSE on the same 20% test split
+- latency: the time for one single-row prediction from the compiled model the
+  game loads, measured here one candidate at a time so busy workers can't
+  skew it
+- memory: the size of the pickled model and of the compiled arrays
+
+The feature matrix is written once to .npy files that every worker memory-maps,
+so the workers share it through the page cache instead of each getting a copy.
+"""
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import train_test_split
+
+from compiled_model import compile_model
+
+# (name, kind, parameters) of every candidate; forest-100 is the old default model.
+CANDIDATES = [
+    ('forest-100', 'forest', {'n_estimators': 100}),
+    ('forest-50-d12', 'forest', {'n_estimators': 50, 'max_depth': 12}),
+    ('forest-20-d8', 'forest', {'n_estimators': 20, 'max_depth': 8}),
+    ('forest-10-d6', 'forest', {'n_estimators': 10, 'max_depth': 6}),
+    ('boosting-200-d3', 'boosting', {'n_estimators': 200, 'max_depth': 3,
+                                     'learning_rate': 0.05}),
+    ('boosting-50-d3', 'boosting', {'n_estimators': 50, 'max_depth': 3,
+                                    'learning_rate': 0.1}),
+    ('linear', 'linear', {}),
+    ('ridge', 'ridge', {'alpha': 1.0}),
+]
+
+_ESTIMATORS = {
+    'forest': lambda params, seed: RandomForestRegressor(random_state=seed, n_jobs=1,
+                                                         **params),
+    'boosting': lambda params, seed: GradientBoostingRegressor(random_state=seed, **params),
+    'linear': lambda params, seed: LinearRegression(**params),
+    'ridge': lambda params, seed: Ridge(**params),
+}
+
+_ARRAYS = ('X_train', 'y_train', 'X_test', 'y_test')
+
+
+def fit_candidate(cache_dir, name, kind, params, seed):
+    """Fit one candidate on the cached matrix; return it with its held-out error."""
+    data = {key: np.load(os.path.join(cache_dir, key + '.npy'), mmap_mode='r')
+            for key in _ARRAYS}
+    model = _ESTIMATORS[kind](params, seed)
+    start = time.perf_counter()
+    model.fit(data['X_train'], data['y_train'])
+    fit_seconds = time.perf_counter() - start
+
+    error = model.predict(data['X_test']) - data['y_test']
+    return {'name': name, 'kind': kind, 'params': params, 'model': model,
+            'fit_s': round(fit_seconds, 3),
+            'mae': float(np.mean(np.abs(error))),
+            'rmse': float(np.sqrt(np.mean(error ** 2)))}
+
+
+def measure_latency(model, row, repeats=2000):
+    """Return the median and 95th percentile time of model.predict([row]) in µs.
+
+    That is the call the difficulty worker makes for every prediction.
+    """
+    for _ in range(50):
+        model.predict([row])
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter_ns()
+        model.predict([row])
+        times[i] = time.perf_counter_ns() - start
+    return (float(np.percentile(times, 50)) / 1000,
+            float(np.percentile(times, 95)) / 1000)
+
+
+def select_model(X, y, budget_us=250.0, workers=None, seed=42, candidates=CANDIDATES):
+    """Fit every candidate and pick the most accurate one within the latency budget.
+
+    Return the chosen sklearn model, a report of every candidate, and the
+    held-out rows. If no candidate is fast enough, the fastest one is chosen.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2,
+                                                        random_state=seed)
+
+    cache_dir = tempfile.mkdtemp(prefix='model_selection_')
+    try:
+        for key, array in zip(_ARRAYS, (X_train, y_train, X_test, y_test)):
+            np.save(os.path.join(cache_dir, key + '.npy'), array)
+        jobs = [(cache_dir, name, kind, params, seed) for name, kind, params in candidates]
+        start = time.perf_counter()
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fit_candidate, *zip(*jobs)))
+        else:
+            results = [fit_candidate(*job) for job in jobs]
+        fit_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # Time every candidate the way the game will run it, on a typical row.
+    row = [float(value) for value in np.median(X_train, axis=0)]
+    models = {}
+    for result in results:
+        model = models[result['name']] = result.pop('model')
+        compiled = compile_model(model)
+        result['latency_us_p50'], result['latency_us_p95'] = measure_latency(compiled, row)
+        result['sklearn_latency_us_p50'], _ = measure_latency(model, row, repeats=200)
+        result['pickle_kb'] = round(len(pickle.dumps(model)) / 1024, 1)
+        result['compiled_kb'] = round(
+            sum(array.nbytes for array in compiled.arrays().values()) / 1024, 1)
+        result['within_budget'] = result['latency_us_p95'] <= budget_us
+
+    results.sort(key=lambda result: (result['mae'], result['rmse']))
+    fits = [result for result in results if result['within_budget']]
+    if fits:
+        chosen, reason = fits[0], 'most accurate within the latency budget'
+    else:
+        chosen = min(results, key=lambda result: result['latency_us_p95'])
+        reason = 'no candidate within the latency budget; chose the fastest'
+
+    report = {
+        'chosen': chosen['name'],
+        'reason': reason,
+        'budget_us': budget_us,
+        'train_rows': len(X_train),
+        'test_rows': len(X_test),
+        'workers': workers,
+        'fit_s': round(fit_seconds, 3),
+        'candidates': results,
+    }
+    return models[chosen['name']], report, X_test
+
+
+def report_path(model_path):
+    """Return where the selection report for a model file goes."""
+    return os.path.splitext(model_path)[0] + '_selection.json'
+
+
+def save_report(report, model_path):
+    """Write the selection report next to the model file and return its path."""
+    path = report_path(model_path)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_report(report):
+    """Print one line per candidate, most accurate first."""
+    print(f"{'candidate':<18} {'MAE':>8} {'RMSE':>8} {'p50 µs':>8} {'p95 µs':>8} "
+          f"{'sklearn µs':>10} {'pickle KB':>10} {'fit s':>7}")
+    for result in report['candidates']:
+        mark = '*' if result['name'] == report['chosen'] else \
+            (' ' if result['within_budget'] else '-')
+        print(f"{mark}{result['name']:<17} {result['mae']:>8.4f} {result['rmse']:>8.4f} "
+              f"{result['latency_us_p50']:>8.1f} {result['latency_us_p95']:>8.1f} "
+              f"{result['sklearn_latency_us_p50']:>10.1f} {result['pickle_kb']:>10.1f} "
+              f"{result['fit_s']:>7.2f}")
+    print(f"Chose {report['chosen']} ({report['reason']}, budget "
+          f"{report['budget_us']:.0f} µs; '-' marks candidates over it).")
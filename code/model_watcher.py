@@ -0,0 +1,78 @@
+import os
+import threading
+
+from compiled_model import load_compiled_model
+
+LATEST = 'LATEST'  # File in the models directory naming the newest version
+
+
+def read_latest(models_dir):
+    """Return the name of the newest published model version, or None if there isn't one."""
+    try:
+        with open(os.path.join(models_dir, LATEST)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_version(models_dir, version):
+    """Load the compiled model of a published version."""
+    return load_compiled_model(os.path.join(models_dir, version, 'compiled'))
+
+
+def load_difficulty_model(settings):
+    """Load the newest published model, else the compiled one, else the pickle.
+
+    Return the model and its published version, which is None for the last two.
+    """
+    version = read_latest(settings.models_dir)
+    if version is not None:
+        return load_version(settings.models_dir, version), version
+    if os.path.isdir(settings.compiled_model_path):
+        return load_compiled_model(settings.compiled_model_path), None
+    import joblib  # Slow to import, and only needed for the pickle
+    return joblib.load(settings.model_path), None
+
+
+class ModelWatcher:
+    """A class to load newly published model versions in the background."""
+
+    def __init__(self, models_dir, on_model, interval=5.0, version=None):
+        """Poll models_dir every interval seconds and pass new models to on_model."""
+        self.models_dir = models_dir
+        self.on_model = on_model
+        self.interval = interval
+        self.version = version
+
+        self.swaps = 0
+        self.errors = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def poll(self):
+        """Load and hand over the newest version if it changed; return True if it did."""
+        version = read_latest(self.models_dir)
+        if version is None or version == self.version:
+            return False
+        try:
+            model = load_version(self.models_dir, version)
+        except (OSError, ValueError, KeyError):
+            # Pruned or unreadable; try again on the next poll.
+            self.errors += 1
+            return False
+        self.version = version
+        self.swaps += 1
+        self.on_model(model, version)
+        return True
+
+    def close(self):
+        """Stop watching."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        """Poll until closed."""
+        while not self._stop.wait(self.interval):
+            self.poll()
@@ -0,0 +1,174 @@
+"""Keep the difficulty model up to date by training only on newly logged metrics.
+
+Each update reads the metrics CSV from where the last update stopped. It grows
+the random forest by a few warm-started trees fitted on the new rows only, and
+drops the oldest trees past --max-trees. The result is published as a new
+version directory:
+
+    models/v000003/model.pkl       the scikit-learn forest, for the next update
+    models/v000003/compiled/       the compiled NumPy model the game loads
+    models/v000003/training.json   byte offset and row count consumed so far
+
+A version is built under a temporary name and renamed into place. The LATEST
+file is then replaced to point at it, so readers never see half a version. The
+checkpoint lives in the version itself, which means a crash can never
+separate the model from the data it was trained on. Running games pick up the
+new version through ModelWatcher.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import time
+
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from compiled_model import CompiledForest, save_compiled_model
+from model_watcher import LATEST, read_latest
+from train_model import FEATURES, TARGET
+
+
+def version_name(number):
+    """Return the directory name of a version number."""
+    return f"v{number:06d}"
+
+
+def load_checkpoint(models_dir):
+    """Return (model, checkpoint) for the newest version, or (None, None) if there is none."""
+    version = read_latest(models_dir)
+    if version is None:
+        return None, None
+    path = os.path.join(models_dir, version)
+    with open(os.path.join(path, 'training.json')) as f:
+        checkpoint = json.load(f)
+    return joblib.load(os.path.join(path, 'model.pkl')), checkpoint
+
+
+def read_new_rows(metrics_path, offset):
+    """Return (rows, new offset) for the complete CSV lines after byte offset.
+
+    An offset of 0 skips the header. If the file is now shorter than offset, it
+    was replaced, and reading starts again from the top.
+    """
+    with open(metrics_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < offset:
+            offset = 0
+        f.seek(0)
+        header = f.readline()
+        columns = header.decode().strip().split(',')
+        offset = max(offset, len(header))
+
+        f.seek(offset)
+        data = f.read()
+
+    # Leave a line that is still being written for the next update.
+    end = data.rfind(b'\n') + 1
+    if not end:
+        return pd.DataFrame(columns=columns), offset
+    rows = pd.read_csv(io.BytesIO(data[:end]), names=columns, header=None)
+    return rows, offset + end
+
+
+def update_model(model, rows, trees, max_trees, seed=None):
+    """Add trees fitted on rows to model, or start one, and drop trees beyond max_trees."""
+    if model is None:
+        model = RandomForestRegressor(n_estimators=trees, warm_start=True, random_state=seed)
+    else:
+        model.warm_start = True
+        model.n_estimators = len(model.estimators_) + trees
+    model.fit(rows[FEATURES], rows[TARGET])
+
+    # The oldest trees go first, so the model follows recent players.
+    if len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.n_estimators = max_trees
+    return model
+
+
+def publish(models_dir, model, checkpoint, keep=5):
+    """Write model as the next version, point LATEST at it and prune old versions."""
+    os.makedirs(models_dir, exist_ok=True)
+    version = version_name(checkpoint['version'])
+    final = os.path.join(models_dir, version)
+    staging = os.path.join(models_dir, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    os.makedirs(staging)
+    joblib.dump(model, os.path.join(staging, 'model.pkl'))
+    save_compiled_model(CompiledForest.from_sklearn(model), os.path.join(staging, 'compiled'))
+    with open(os.path.join(staging, 'training.json'), 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(staging, final)
+
+    pointer = os.path.join(models_dir, f".{LATEST}.tmp")
+    with open(pointer, 'w') as f:
+        f.write(version + '\n')
+    os.replace(pointer, os.path.join(models_dir, LATEST))
+
+    versions = sorted(name for name in os.listdir(models_dir)
+                      if name.startswith('v') and name != version)
+    for name in versions[:max(0, len(versions) - (keep - 1))]:
+        shutil.rmtree(os.path.join(models_dir, name), ignore_errors=True)
+    return version
+
+
+def run_update(metrics_path, models_dir, trees=10, max_trees=200, min_rows=200,
+               base_model=None, keep=5, seed=None):
+    """Train on the rows logged since the last update; return the new version or None."""
+    start = time.perf_counter()
+    model, checkpoint = load_checkpoint(models_dir)
+    if checkpoint is None:
+        checkpoint = {'version': 0, 'offset': 0, 'rows': 0}
+        if base_model is not None and os.path.exists(base_model):
+            model = joblib.load(base_model)
+    if checkpoint.get('metrics_path') not in (None, os.path.abspath(metrics_path)):
+        checkpoint['offset'] = 0  # A different log starts from its beginning
+
+    rows, offset = read_new_rows(metrics_path, checkpoint['offset'])
+    rows = rows.dropna()
+    if len(rows) < min_rows:
+        print(f"{len(rows)} new rows; waiting for at least {min_rows}.")
+        return None
+
+    model = update_model(model, rows, trees, max_trees, seed)
+    checkpoint = {
+        'version': checkpoint['version'] + 1,
+        'metrics_path': os.path.abspath(metrics_path),
+        'offset': offset,
+        'rows': checkpoint['rows'] + len(rows),
+        'new_rows': len(rows),
+        'trees': len(model.estimators_),
+        'created': time.time(),
+    }
+    version = publish(models_dir, model, checkpoint, keep)
+    print(f"Published {version}: {len(rows)} new rows ({checkpoint['rows']} total), "
+          f"{checkpoint['trees']} trees, {time.perf_counter() - start:.2f}s.")
+    return version
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--metrics', default='player_metrics.csv')
+    parser.add_argument('--models', default='models', help="Directory of model versions.")
+    parser.add_argument('--trees', type=int, default=10, help="Trees added per update.")
+    parser.add_argument('--max-trees', type=int, default=200)
+    parser.add_argument('--min-rows', type=int, default=200,
+                        help="Wait for at least this many new rows before updating.")
+    parser.add_argument('--base', default='difficulty_model.pkl',
+                        help="Model to grow from when there are no versions yet.")
+    parser.add_argument('--keep', type=int, default=5, help="Versions kept on disk.")
+    parser.add_argument('--watch', type=float, default=None, metavar='SECONDS',
+                        help="Keep running, checking for new rows this often.")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    while True:
+        run_update(args.metrics, args.models, args.trees, args.max_trees, args.min_rows,
+                   args.base, args.keep, args.seed)
+        if args.watch is None:
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,165 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import numpy as np
+import pygame
+
+
+class NullProfiler:
+    """A profiler that does nothing, used while profiling is off."""
+
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """A class to time each phase of a frame and keep rolling percentiles."""
+
+    enabled = True
+
+    def __init__(self, phases, budget_ms=1000 / 60, window=600, max_misses=100):
+        """Prepare a ring buffer of per-phase times for the last window frames."""
+        self.phases = tuple(phases)
+        self._index = {phase: i for i, phase in enumerate(self.phases)}
+        self.budget_ms = budget_ms
+        self._budget_ns = int(budget_ms * 1e6)
+
+        # One row per frame: a column per phase, then the frame's total, in ns.
+        self.window = window
+        self._times = np.zeros((window, len(self.phases) + 1), dtype=np.int64)
+        self._peak = np.zeros(len(self.phases) + 1, dtype=np.int64)
+        self._row = self._times[0]
+        self._next = 0
+        self.frames = 0
+
+        # Frames over budget, and the phase that took longest in each.
+        self.misses = deque(maxlen=max_misses)
+        self.miss_counts = dict.fromkeys(self.phases, 0)
+
+        self._frame_start = 0
+        self._mark = 0
+        self._font = None
+        self._overlay = None
+        self._overlay_frame = None
+
+    def begin_frame(self):
+        """Start timing a frame."""
+        self._row = self._times[self._next]
+        self._row[:] = 0
+        self._frame_start = self._mark = perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to phase."""
+        now = perf_counter_ns()
+        self._row[self._index[phase]] += now - self._mark
+        self._mark = now
+
+    def end_frame(self):
+        """Finish the frame and note it if it went over budget."""
+        row = self._row
+        row[-1] = perf_counter_ns() - self._frame_start
+        np.maximum(self._peak, row, out=self._peak)
+        self.frames += 1
+        self._next = (self._next + 1) % self.window
+
+        if row[-1] > self._budget_ns:
+            worst = int(row[:-1].argmax())
+            phase = self.phases[worst]
+            self.miss_counts[phase] += 1
+            self.misses.append({'frame': self.frames, 'frame_ms': row[-1] / 1e6,
+                                'phase': phase, 'phase_ms': row[worst] / 1e6})
+
+    def stats(self):
+        """Return p50, p95, p99 and max milliseconds for each phase and the whole frame."""
+        recent = self._times[:min(self.frames, self.window)]
+        if not len(recent):
+            recent = np.zeros((1, len(self.phases) + 1), dtype=np.int64)
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99], axis=0) / 1e6
+        maxima = recent.max(axis=0) / 1e6
+        peaks = self._peak / 1e6
+        total_misses = sum(self.miss_counts.values())
+        rows = []
+        for i, phase in enumerate(self.phases + ('frame',)):
+            rows.append({
+                'phase': phase,
+                'p50_ms': round(float(p50[i]), 4),
+                'p95_ms': round(float(p95[i]), 4),
+                'p99_ms': round(float(p99[i]), 4),
+                'max_ms': round(float(maxima[i]), 4),
+                'peak_ms': round(float(peaks[i]), 4),
+                'budget_misses': self.miss_counts.get(phase, total_misses),
+            })
+        return rows
+
+    def dump(self, path):
+        """Write the statistics to path, as CSV if it ends in .csv and JSON otherwise."""
+        rows = self.stats()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w') as f:
+                json.dump({'frames': self.frames, 'window': self.window,
+                           'budget_ms': self.budget_ms, 'phases': rows,
+                           'recent_misses': list(self.misses)}, f, indent=2)
+
+    def draw(self, surface, refresh=30):
+        """Draw a table of phase timings in the bottom-left corner and return its rect.
+
+        The table is only re-rendered every refresh frames.
+        """
+        if self._overlay is None or self.frames - self._overlay_frame >= refresh:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self.frames
+        rect = self._overlay.get_rect(bottomleft=surface.get_rect().bottomleft)
+        return surface.blit(self._overlay, rect)
+
+    def _render_overlay(self):
+        """Render the current statistics as a small table."""
+        if self._font is None:
+            self._font = pygame.font.SysFont('monospace', 14)
+        font = self._font
+        white = (255, 255, 255)
+
+        rows = [('phase', 'p50', 'p95', 'p99', 'max', 'miss')]
+        for row in self.stats():
+            rows.append((row['phase'], f"{row['p50_ms']:.2f}", f"{row['p95_ms']:.2f}",
+                         f"{row['p99_ms']:.2f}", f"{row['max_ms']:.2f}",
+                         str(row['budget_misses'])))
+        cells = [[font.render(text, True, white) for text in row] for row in rows]
+        widths = [max(row[i].get_width() for row in cells) + 8 for i in range(len(rows[0]))]
+        footer = None
+        if self.misses:
+            last = self.misses[-1]
+            footer = font.render(f"last miss: frame {last['frame']}, "
+                                 f"{last['frame_ms']:.1f} ms, {last['phase']}", True, white)
+
+        # Opaque, since it's drawn over itself every frame in dirty-rect mode.
+        height = font.get_linesize()
+        width = max(sum(widths), footer.get_width() if footer else 0) + 8
+        overlay = pygame.Surface((width, height * (len(cells) + bool(footer)) + 8))
+        for y, row in enumerate(cells):
+            x = 4
+            for i, cell in enumerate(row):
+                # Phase names on the left, numbers right-aligned.
+                offset = 0 if i == 0 else widths[i] - cell.get_width()
+                overlay.blit(cell, (x + offset, 4 + y * height))
+                x += widths[i]
+        if footer:
+            overlay.blit(footer, (4, 4 + len(cells) * height))
+        return overlay
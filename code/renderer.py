@@ -0,0 +1,236 @@
+from time import perf_counter
+
+import pygame
+
+# Render profiles: (internal scale of the playfield, HUD drawn, adapt the scale
+# to frame time). The HUD is 'full', 'score' for the score alone, or 'off'.
+RENDER_PROFILES = {
+    'native': (1.0, 'full', False),
+    'low': (0.5, 'score', False),
+    'adaptive': (1.0, 'full', True),
+}
+
+
+class DirtyRenderer:
+    """A class to redraw and push only the parts of the screen that changed."""
+
+    def __init__(self, ai_game):
+        """Remember the game and start with a full redraw."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.bg_color = ai_game.settings.bg_color
+
+        # What was drawn last frame, so it can be erased this frame.
+        self._sprite_rects = []
+        self._hud_rects = []
+        self._button_rect = None
+        self._was_active = None
+        self._full_redraw = True
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame."""
+        self._full_redraw = True
+
+    def draw(self):
+        """Erase last frame's sprites, draw this frame's, and update only those areas."""
+        game = self.ai_game
+        sb = game.sb
+        if self._full_redraw:
+            self._draw_full()
+            return
+
+        # The Play screen doesn't change until the player does something.
+        if not game.game_active and self._was_active is False and not sb.dirty:
+            return
+
+        screen = self.screen
+        changed = self._sprite_rects
+        for rect in changed:
+            screen.fill(self.bg_color, rect)
+        if self._button_rect is not None and game.game_active:
+            screen.fill(self.bg_color, self._button_rect)
+            changed.append(self._button_rect)
+            self._button_rect = None
+        if sb.dirty:
+            # Score images can shrink, so clear their old areas.
+            for rect in self._hud_rects:
+                screen.fill(self.bg_color, rect)
+            changed.extend(self._hud_rects)
+
+        self._sprite_rects = game._draw_sprites()
+        changed.extend(self._sprite_rects)
+
+        # The HUD is drawn over the sprites and may be partly transparent.
+        if sb.dirty:
+            self._hud_rects = sb.show_score()
+            changed.extend(self._hud_rects)
+        else:
+            # Rebuild any HUD area a sprite was erased from or drawn over,
+            # clipped to that area so the rest of the HUD isn't drawn twice.
+            for rect in self._hud_rects:
+                if rect.collidelist(changed) != -1:
+                    screen.set_clip(rect)
+                    screen.fill(self.bg_color)
+                    game._draw_sprites()
+                    sb.show_score()
+                    changed.append(rect)
+            screen.set_clip(None)
+
+        if not game.game_active:
+            self._button_rect = game.play_button.draw_button()
+            changed.append(self._button_rect)
+        self._was_active = game.game_active
+
+        pygame.display.update(changed)
+
+    def _draw_full(self):
+        """Redraw everything, flip, and remember what was drawn."""
+        game = self.ai_game
+        self._sprite_rects = game._draw_frame()
+        self._hud_rects = [rect.copy() for rect in (
+            game.sb.score_rect, game.sb.high_score_rect, game.sb.level_rect)]
+        self._hud_rects.extend(ship.rect.copy() for ship in game.sb.ships.sprites())
+        self._button_rect = None if game.game_active else game.play_button.rect
+        self._was_active = game.game_active
+        self._full_redraw = False
+        pygame.display.flip()
+
+
+class ScaledCanvas:
+    """A class to draw sprites given in screen coordinates onto a smaller surface.
+
+    Positions and images are both scaled, so the game's objects keep their
+    screen coordinates whatever the internal resolution. Each image is
+    scaled once and reused.
+    """
+
+    def __init__(self, surface, scale):
+        """Draw onto surface, which is scale times the size of the screen."""
+        self.surface = surface
+        self.scale = scale
+        self._images = {}
+
+    def fill(self, color):
+        """Fill the whole canvas with color."""
+        self.surface.fill(color)
+
+    def image(self, image):
+        """Return image scaled to the canvas."""
+        if self.scale == 1.0:
+            return image
+        scaled = self._images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            scaled = self._images[image] = pygame.transform.scale(image, size)
+        return scaled
+
+    def blit(self, image, dest):
+        """Draw image with its top-left corner at a screen position; return the area drawn."""
+        scale = self.scale
+        return self.surface.blit(self.image(image), (round(dest[0] * scale),
+                                                     round(dest[1] * scale)))
+
+    def blits(self, sequence):
+        """Draw several (image, screen position) pairs; return the areas drawn."""
+        scale = self.scale
+        image = self.image
+        return self.surface.blits([(image(img), (round(x * scale), round(y * scale)))
+                                   for img, (x, y) in sequence])
+
+
+class ScaledRenderer:
+    """A class to draw the playfield at a reduced internal resolution.
+
+    The sprites are drawn to an offscreen canvas a fraction of the screen's
+    size, which is stretched to the screen once per frame; the HUD and the
+    Play button are then drawn at full size over it. The adaptive profile
+    moves down the settings' render_scales while frames take longer to draw
+    than the budget, and back up while they take less than half of it.
+    """
+
+    def __init__(self, ai_game, profile):
+        """Set up the canvas for the profile's starting scale."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        settings = ai_game.settings
+        self.bg_color = settings.bg_color
+        scale, self.hud, self.adaptive = RENDER_PROFILES[profile]
+        self.scales = sorted(settings.render_scales, reverse=True) if self.adaptive else [scale]
+
+        # Drawing may take this long before the adaptive profile lowers the scale.
+        fps = settings.render_fps or settings.fps
+        self.budget_ms = settings.render_budget_ms or 500 / fps
+        self.patience = settings.render_adapt_frames  # Frames over or under budget before changing
+        self.frame_ms = 0.0  # Moving average of the time to draw a frame
+        self._over = 0
+        self._under = 0
+        self.scale_changes = 0
+        self._idle_drawn = False  # The Play screen is up and already drawn
+
+        self.level = 0
+        self._use_scale(self.scales[0])
+
+    @property
+    def scale(self):
+        """Return the internal scale in use."""
+        return self.canvas.scale
+
+    def invalidate(self):
+        """Redraw the Play screen on the next frame; other frames are always drawn in full."""
+        self._idle_drawn = False
+
+    def draw(self):
+        """Draw the sprites to the canvas, stretch it to the screen, add the HUD and flip."""
+        game = self.ai_game
+        # The Play screen doesn't change until the player does something.
+        if self._idle_drawn and not game.game_active and not game.sb.dirty:
+            return
+        start = perf_counter()
+        canvas = self.canvas
+        canvas.fill(self.bg_color)
+        game._draw_sprites(canvas)
+        if canvas.surface is not self.screen:
+            pygame.transform.scale(canvas.surface, self.screen.get_size(), self.screen)
+
+        if self.hud == 'full':
+            game.sb.show_score()
+        elif self.hud == 'score':
+            self.screen.blit(game.sb.score_image, game.sb.score_rect)
+        game.sb.dirty = False
+        if not game.game_active:
+            game.play_button.draw_button()
+        self._idle_drawn = not game.game_active
+        pygame.display.flip()
+
+        if self.adaptive:
+            self._adapt((perf_counter() - start) * 1000)
+
+    def _adapt(self, ms):
+        """Lower the scale after frames over budget, raise it after frames with room to spare."""
+        self.frame_ms += (ms - self.frame_ms) * 0.1
+        if self.frame_ms > self.budget_ms:
+            self._over, self._under = self._over + 1, 0
+        elif self.frame_ms < self.budget_ms / 2:
+            self._over, self._under = 0, self._under + 1
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.patience and self.level < len(self.scales) - 1:
+            self.level += 1
+        elif self._under >= self.patience and self.level > 0:
+            self.level -= 1
+        else:
+            return
+        self._over = self._under = 0
+        self.scale_changes += 1
+        self._use_scale(self.scales[self.level])
+
+    def _use_scale(self, scale):
+        """Make a canvas for scale; at full scale the sprites go straight to the screen."""
+        if scale == 1.0:
+            self.canvas = ScaledCanvas(self.screen, 1.0)
+            return
+        width, height = self.screen.get_size()
+        surface = pygame.Surface((round(width * scale), round(height * scale))).convert()
+        self.canvas = ScaledCanvas(surface, scale)
@@ -0,0 +1,177 @@
+"""Record a session's inputs and replay it headlessly, checking every frame.
+
+A recording holds what the game can't work out for itself:
+
+- the seed behind every random choice (fleet drops, power-ups)
+- the settings the session started with
+- one byte of input per tick of the game loop: left and right held, Play
+  clicked, and how many times fire was pressed
+- every difficulty prediction the game applied, with its frame, since
+  predictions arrive from a worker thread at times that vary between runs
+
+It also holds a CRC32 hash of the game state after every tick. A replay feeds
+the same inputs to a headless game as fast as it can run and compares the
+hashes, so a recording is both a benchmark workload and a regression fixture:
+any change to the game logic shows up as the first tick that differs.
+
+Record by setting ALIEN_RECORD=session.replay before starting the game, or
+with simulate.py --record. Then:
+
+    python replay.py session.replay
+"""
+import argparse
+import json
+import os
+import sys
+import zlib
+from array import array
+from time import perf_counter
+
+import numpy as np
+
+# Bits of the per-tick input byte; the fire count takes the top five bits.
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+PLAY = 4
+FIRE_SHIFT = 3
+MAX_FIRES = 31
+
+FORMAT_VERSION = 1
+
+
+def state_hash(ai_game):
+    """Return a CRC32 of everything that decides how the game plays out from here."""
+    stats, settings, fleet = ai_game.stats, ai_game.settings, ai_game.aliens
+    n = fleet.count
+    crc = zlib.crc32(fleet.x[:n].tobytes())
+    crc = zlib.crc32(fleet.y[:n].tobytes(), crc)
+    crc = zlib.crc32(fleet.alive[:n].tobytes(), crc)
+    sprites = [value for bullet in ai_game.bullets for value in (bullet.y, bullet.rect.x)]
+    sprites += [value for powerup in ai_game.powerups for value in powerup.rect.topleft]
+    crc = zlib.crc32(np.array(sprites, dtype=np.float64).tobytes(), crc)
+    scalars = (ai_game.frames, ai_game.game_active, ai_game.ship.x, stats.score,
+               stats.ships_left, stats.level, stats.shots_fired, stats.shots_hit,
+               stats.lives_lost, settings.alien_speed, settings.fleet_direction)
+    return zlib.crc32(np.array(scalars, dtype=np.float64).tobytes(), crc)
+
+
+class InputRecorder:
+    """A class to record a session's inputs, predictions and state hashes."""
+
+    def __init__(self, seed, settings):
+        """Start an empty recording of a game with this seed and settings."""
+        self.seed = seed
+        self.settings = dict(vars(settings))
+        self.inputs = bytearray()
+        self.hashes = array('I')
+        self.speed_frames = array('q')
+        self.speed_values = array('d')
+
+    def record_tick(self, ai_game, move_left, move_right, fires, play):
+        """Record one tick's inputs and the state they led to."""
+        code = (MOVE_LEFT if move_left else 0) | (MOVE_RIGHT if move_right else 0)
+        code |= (PLAY if play else 0) | min(fires, MAX_FIRES) << FIRE_SHIFT
+        self.inputs.append(code)
+        self.hashes.append(state_hash(ai_game))
+
+    def record_speed(self, frame, speed):
+        """Record a difficulty prediction applied on a frame."""
+        self.speed_frames.append(frame)
+        self.speed_values.append(speed)
+
+    def save(self, path):
+        """Write the recording to path as a compressed NumPy archive."""
+        meta = {'version': FORMAT_VERSION, 'seed': self.seed, 'settings': self.settings}
+        # A file object stops NumPy from adding .npz to the name.
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f, meta=np.array(json.dumps(meta)),
+                inputs=np.frombuffer(self.inputs, dtype=np.uint8),
+                hashes=np.frombuffer(self.hashes, dtype=np.uint32),
+                speed_frames=np.frombuffer(self.speed_frames, dtype=np.int64),
+                speed_values=np.frombuffer(self.speed_values, dtype=np.float64))
+
+
+class Recording:
+    """A class to hold a loaded recording."""
+
+    def __init__(self, path):
+        """Load the recording at path."""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != FORMAT_VERSION:
+                raise ValueError(f"{path} is a version {meta['version']} recording; "
+                                 f"this game replays version {FORMAT_VERSION}.")
+            self.seed = meta['seed']
+            self.settings = meta['settings']
+            self.inputs = data['inputs']
+            self.hashes = data['hashes']
+            # Frame numbers only increase, so each frame has at most one prediction.
+            self.speeds = dict(zip(data['speed_frames'].tolist(),
+                                   data['speed_values'].tolist()))
+
+    def __len__(self):
+        """Return the number of ticks recorded."""
+        return len(self.inputs)
+
+
+def replay(path, verify=True, settings=None):
+    """Replay a recording headlessly as fast as possible and return run statistics.
+
+    With verify, the state is hashed after every tick and the replay stops at
+    the first tick that doesn't match the recording.
+    """
+    from settings import Settings
+    from alien_invasion import AlienInvasion
+
+    recording = Recording(path)
+    settings = settings if settings is not None else Settings()
+    for name, value in recording.settings.items():
+        setattr(settings, name, tuple(value) if isinstance(value, list) else value)
+    # Replays leave no trace: no metrics, no profile, no new recording.
+    settings.metrics_format = 'csv'
+    settings.metrics_path = os.devnull
+    settings.record_path = None
+
+    ai = AlienInvasion(settings=settings, headless=True, seed=recording.seed,
+                       recording=recording)
+    ai.metrics_sink.ready.wait()
+    diverged_at = None
+    start = perf_counter()
+    for tick, code in enumerate(recording.inputs.tolist()):
+        ai.replay_tick(code & MOVE_LEFT, code & MOVE_RIGHT, code >> FIRE_SHIFT, code & PLAY)
+        if verify and state_hash(ai) != recording.hashes[tick]:
+            diverged_at = tick
+            break
+    elapsed = perf_counter() - start
+    ai.close()
+
+    ticks = len(recording) if diverged_at is None else diverged_at + 1
+    return {
+        'ticks': ticks,
+        'frames': ai.frames,
+        'seconds': elapsed,
+        'fps': ticks / elapsed if elapsed > 0 else 0.0,
+        'score': ai.stats.score,
+        'diverged_at': diverged_at,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording')
+    parser.add_argument('--no-verify', action='store_true',
+                        help="Skip the per-tick hash checks, to time the game logic alone.")
+    parser.add_argument('--repeat', type=int, default=1, help="Replay this many times.")
+    args = parser.parse_args()
+
+    for _ in range(args.repeat):
+        result = replay(args.recording, verify=not args.no_verify)
+        print(f"{result['ticks']} ticks, {result['frames']} frames in "
+              f"{result['seconds']:.2f}s ({result['fps']:.0f} ticks per second), "
+              f"score {result['score']}")
+        if result['diverged_at'] is not None:
+            print(f"State differs from the recording at tick {result['diverged_at']}.")
+            sys.exit(1)
+    if not args.no_verify:
+        print("Every tick matched the recording.")
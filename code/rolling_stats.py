@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class RollingWindow:
+    """A class to keep the last capacity values in a NumPy ring buffer.
+
+    Running sums give the mean and variance in O(1). The sums are rebuilt
+    from the buffer each time it wraps, so rounding errors can't build up
+    over a long session; that costs O(capacity) once every capacity values.
+    With bins=(low, high, count), a histogram of the window is kept as well,
+    for approximate percentiles at a cost set by the number of bins.
+    append() returns each value's position, which replace() takes to change
+    the value while it's still in the window.
+    """
+
+    def __init__(self, capacity, bins=None):
+        """Start an empty window of capacity values."""
+        self.capacity = capacity
+        self.values = np.zeros(capacity)
+        self._next = 0  # Slot the next value goes in
+        self._count = 0
+        self._appended = 0  # Values ever appended; clearing doesn't reset it
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+        self.edges = None
+        self.counts = None
+        if bins is not None:
+            low, high, count = bins
+            self.edges = np.linspace(low, high, count + 1)
+            self.counts = np.zeros(count, dtype=np.int64)
+            self._bin_scale = count / (high - low)
+            self._bins = np.zeros(capacity, dtype=np.int64)  # Each value's bin
+
+    def __len__(self):
+        """Return the number of values in the window."""
+        return self._count
+
+    def append(self, value):
+        """Add a value, dropping the oldest once the window is full; return its position."""
+        slot = self._next
+        if self._count == self.capacity:
+            self._remove(slot)
+        else:
+            self._count += 1
+        self._put(slot, value)
+
+        self._next = (slot + 1) % self.capacity
+        if self._next == 0:
+            self._sum = float(self.values.sum())
+            self._sum_sq = float(np.dot(self.values, self.values))
+        self._appended += 1
+        return self._appended - 1
+
+    def replace(self, position, value):
+        """Change the value appended at position; return False if it has left the window."""
+        if not self._appended - self._count <= position < self._appended:
+            return False
+        slot = (self._next - (self._appended - position)) % self.capacity
+        self._remove(slot)
+        self._put(slot, value)
+        return True
+
+    def clear(self):
+        """Empty the window."""
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        if self.counts is not None:
+            self.counts[:] = 0
+
+    def _remove(self, slot):
+        """Take the value in slot out of the sums and histogram."""
+        old = self.values.item(slot)
+        self._sum -= old
+        self._sum_sq -= old * old
+        if self.counts is not None:
+            self.counts[self._bins[slot]] -= 1
+
+    def _put(self, slot, value):
+        """Store value in slot and add it to the sums and histogram."""
+        self.values[slot] = value
+        self._sum += value
+        self._sum_sq += value * value
+        if self.counts is not None:
+            # Values outside the histogram's range count in its end bins.
+            index = min(max(int((value - self.edges[0]) * self._bin_scale), 0),
+                        self.counts.size - 1)
+            self._bins[slot] = index
+            self.counts[index] += 1
+
+    def last(self):
+        """Return the newest value, or None if the window is empty."""
+        if not self._count:
+            return None
+        return self.values.item(self._next - 1)
+
+    def sum(self):
+        """Return the sum of the values in the window."""
+        return self._sum
+
+    def mean(self):
+        """Return the mean of the window, or None if it's empty."""
+        if not self._count:
+            return None
+        return self._sum / self._count
+
+    def variance(self):
+        """Return the population variance of the window, or None if it's empty."""
+        if not self._count:
+            return None
+        mean = self._sum / self._count
+        return max(self._sum_sq / self._count - mean * mean, 0.0)
+
+    def percentile(self, q):
+        """Return the approximate q-th percentile (0-100), interpolated within a histogram bin."""
+        if not self._count:
+            return None
+        cumulative = np.cumsum(self.counts)
+        target = q / 100 * self._count
+        index = min(int(np.searchsorted(cumulative, target)), self.counts.size - 1)
+        below = cumulative[index] - self.counts[index]
+        fraction = (target - below) / self.counts[index] if self.counts[index] else 0.0
+        low, high = self.edges[index], self.edges[index + 1]
+        return float(low + fraction * (high - low))
@@ -0,0 +1,99 @@
+import heapq
+from itertools import count
+
+
+class Timer:
+    """A class to represent one scheduled callback."""
+
+    __slots__ = ('due', 'interval', 'callback', 'args', 'active')
+
+    def __init__(self, due, interval, callback, args):
+        """Store when the timer fires, how often it repeats, and what it calls."""
+        self.due = due
+        self.interval = interval  # Ticks between repeats, or None for a one-shot timer
+        self.callback = callback
+        self.args = args
+        self.active = True  # False once it has fired for good or been cancelled
+
+
+class Scheduler:
+    """A class to run callbacks after an amount of game time, from the main loop.
+
+    Game time is counted in ticks, one per call to advance(), so it only passes
+    while the game is stepped: timers stand still on the Play screen, and a
+    replay fires every timer on the same step as the session it replays.
+    Delays are given in seconds and rounded to whole ticks at rate ticks per
+    second. Timers wait in a heap ordered by when they're due, so advancing
+    costs O(log n) per timer that fires and nothing for the rest.
+    """
+
+    def __init__(self, rate):
+        """Start at tick 0 with no timers."""
+        self.rate = rate
+        self.ticks = 0
+        self._heap = []
+        self._order = count()  # Timers due on the same tick fire in the order they were set
+        self._cancelled = 0
+        self.fired = 0
+
+    def __len__(self):
+        """Return the number of timers waiting to fire."""
+        return len(self._heap) - self._cancelled
+
+    @property
+    def time(self):
+        """Return the game time in seconds."""
+        return self.ticks / self.rate
+
+    def call_later(self, delay, callback, *args):
+        """Call callback(*args) once, delay seconds of game time from now."""
+        return self._push(Timer(self.ticks + self._to_ticks(delay), None, callback, args))
+
+    def call_every(self, interval, callback, *args):
+        """Call callback(*args) every interval seconds of game time, starting one interval from now."""
+        ticks = self._to_ticks(interval)
+        return self._push(Timer(self.ticks + ticks, ticks, callback, args))
+
+    def cancel(self, timer):
+        """Stop a timer; cancelled timers stay in the heap until they come due."""
+        if timer.active:
+            timer.active = False
+            self._cancelled += 1
+            # Rebuild the heap once it's mostly cancelled timers, so it can't grow without bound.
+            if self._cancelled > 32 and self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if entry[2].active]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def clear(self):
+        """Cancel every timer."""
+        for entry in self._heap:
+            entry[2].active = False
+        self._heap.clear()
+        self._cancelled = 0
+
+    def advance(self):
+        """Move game time on by one tick and run every timer that has come due."""
+        self.ticks += 1
+        heap = self._heap
+        while heap and heap[0][0] <= self.ticks:
+            timer = heapq.heappop(heap)[2]
+            if not timer.active:
+                self._cancelled -= 1
+                continue
+            if timer.interval is None:
+                timer.active = False
+            else:
+                timer.due += timer.interval
+                heapq.heappush(heap, (timer.due, next(self._order), timer))
+            self.fired += 1
+            timer.callback(*timer.args)
+
+    def _to_ticks(self, seconds):
+        """Convert a delay in seconds to whole ticks, at least one."""
+        return max(1, round(seconds * self.rate))
+
+    def _push(self, timer):
+        """Add a timer to the heap and return it."""
+        heapq.heappush(self._heap, (timer.due, next(self._order), timer))
+        return timer
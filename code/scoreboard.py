@@ -1,6 +1,7 @@
 import pygame.font
 from pygame.sprite import Group
 from ship import Ship
+from glyph_atlas import GlyphAtlas
 
 class Scoreboard:
     """A class to report scoring information."""
@@ -17,6 +18,12 @@ class Scoreboard:
         self.text_color = (255, 223, 186)  # Light orange color for text
         self.font = pygame.font.SysFont('Comic Sans MS', 48)  # Changed font for better readability
 
+        # Digits and commas are rendered once; scores are built from them.
+        self.text = GlyphAtlas(self.font, self.text_color, (0, 0, 0))  # Black background for contrast
+
+        # Set whenever a score image changes, so dirty-rect rendering knows to redraw.
+        self.dirty = True
+
         # Prepare the initial score images.
         self.prep_score()
         self.prep_high_score()
@@ -27,36 +34,36 @@ class Scoreboard:
         """Turn the score into a rendered image."""
         rounded_score = round(self.stats.score, -1)
         score_str = f"{rounded_score:,}"
-        self.score_image = self.font.render(score_str, True,
-                                             self.text_color, (0, 0, 0))  # Black background for contrast
+        self.score_image = self.text.render(score_str)
 
         # Display the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - 20
         self.score_rect.top = 20
+        self.dirty = True
 
     def prep_high_score(self):
         """Turn the high score into a rendered image."""
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(high_score_str, True,
-                                                  self.text_color, (0, 0, 0))  # Black background for contrast
+        self.high_score_image = self.text.render(high_score_str)
 
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
+        self.dirty = True
 
     def prep_level(self):
         """Turn the level into a rendered image."""
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True,
-                                             self.text_color, (0, 0, 0))  # Black background for contrast
+        self.level_image = self.text.render(level_str)
 
         # Position the level below the score.
         self.level_rect = self.level_image.get_rect()
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + 10
+        self.dirty = True
 
     def prep_ships(self):
         """Show how many ships are left."""
@@ -66,6 +73,7 @@ class Scoreboard:
             ship.rect.x = 10 + ship_number * ship.rect.width
             ship.rect.y = 10
             self.ships.add(ship)
+        self.dirty = True
 
     def check_high_score(self):
         """Check to see if there's a new high score."""
@@ -74,8 +82,13 @@ class Scoreboard:
             self.prep_high_score()
 
     def show_score(self):
-        """Draw scores, level, and ships to the screen."""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
+        """Draw scores, level, and ships to the screen. Return the rects drawn."""
+        rects = [
+            self.screen.blit(self.score_image, self.score_rect),
+            self.screen.blit(self.high_score_image, self.high_score_rect),
+            self.screen.blit(self.level_image, self.level_rect),
+        ]
         self.ships.draw(self.screen)
+        rects.extend(ship.rect for ship in self.ships.sprites())
+        self.dirty = False
+        return rects
@@ -7,9 +7,23 @@ class Settings:
         self.screen_width = 1000
         self.screen_height = 700
         self.bg_color = (10, 10, 30)  # A deep navy blue for space theme
+        self.fps = 60  # Game logic steps per second, however fast frames are drawn
+        self.render_fps = 60  # Most frames drawn per second; 0 draws as often as possible
+        self.max_steps_per_frame = 5  # Past this many steps behind, the game slows down
+        self.interpolate = True  # Draw moving sprites between their last two steps
+        self.collision_cell_size = 64  # Spatial hash cell size; at least an alien's width
+        self.preload_assets = True  # Load every image and sound before the first frame
+        # 'full' redraws everything; 'dirty' redraws only what changed, which bench_render.py
+        # shows is slower than 'full' once the fleet is large.
+        self.render_mode = 'full'
+        self.render_profile = 'native'  # 'native', 'low' or 'adaptive'; see renderer.RENDER_PROFILES
+        self.render_scales = (1.0, 0.75, 0.5)  # Internal scales the adaptive profile moves between
+        self.render_budget_ms = None  # Adaptive drawing budget per frame; None for half a frame
+        self.render_adapt_frames = 30  # Frames over or under budget before the scale changes
 
         # Ship settings
         self.ship_limit = 3
+        self.respawn_delay = 0.5  # Seconds the game holds still after the ship is hit
 
         # Bullet settings
         self.bullet_width = 5  # Increased width for better visibility
@@ -19,14 +33,45 @@ class Settings:
 
         # Alien settings
         self.fleet_drop_speed = 10
+        self.initial_alien_speed = 1.0  # Alien speed at the start of each game
 
         # How quickly the game speeds up
         self.speedup_scale = 1.1
         # How quickly the alien point values increase
         self.score_scale = 1.5
 
+        # Sound settings
+        self.audio_muted = False  # Headless games are always muted
+        self.audio_steal_after = 6  # Frames a sound plays before a new one may cut it off
+
         # Power-up settings
-        self.powerup_duration = 5  # Duration of power-ups in seconds
+        self.powerup_duration = 5  # Seconds of game time a power-up lasts
+        self.powerups_reserved = 12  # Built up front; bot games rarely have 10 on screen
+
+        # Difficulty model settings
+        self.model_path = 'difficulty_model.pkl'
+        self.compiled_model_path = 'difficulty_model_compiled'  # Used instead of the pickle if present
+        self.difficulty_update_hz = 4  # Predictions requested per second
+        self.reaction_window = 16  # Recent reaction times the features average over
+        self.shot_window = 64  # Recent shots and hits the features' accuracy is taken over
+        self.models_dir = 'models'  # Versions published by online_training.py; newest wins
+        self.model_poll_interval = 5.0  # Seconds between checks for a new version; 0 to stop
+        self.difficulty_service = None  # Unix socket of a running difficulty_service.py, if any
+        self.difficulty_service_timeout = 1.0  # Seconds without a reply before predicting locally
+
+        # Metrics logging settings
+        self.metrics_path = 'player_metrics.csv'
+        self.metrics_format = 'csv'  # 'binary' writes a MetricsStore; use a .bin metrics_path
+        self.metrics_buffer_size = 10000  # Rows kept in memory before the oldest are dropped
+        self.metrics_batch_size = 600  # Rows written per batch (about 10 seconds of play)
+        self.metrics_flush_interval = 2.0  # Seconds of game time between writes
+
+        # Profiling settings (set ALIEN_PROFILE=1, or =overlay, or press F3/F4 in game)
+        self.profile_path = 'frame_profile.json'  # Written at exit if profiling ran; .csv works too
+        self.profile_window = 600  # Frames behind the rolling percentiles
+
+        # Input recording (see replay.py); ALIEN_RECORD=path also turns it on
+        self.record_path = None  # Written at exit when set
 
         self.initialize_dynamic_settings()
 
@@ -34,7 +79,7 @@ class Settings:
         """Initialize settings that change throughout the game."""
         self.ship_speed = 1.5
         self.bullet_speed = 3.0  # Increased bullet speed for a faster-paced game
-        self.alien_speed = 1.0
+        self.alien_speed = self.initial_alien_speed
 
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
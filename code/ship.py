@@ -11,18 +11,18 @@ class Ship(Sprite):
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
 
-        # Load the ship image and scale it to the desired size
-        self.image = pygame.image.load('ship.bmp')  # Ensure the path is correct
-
-        # Set the desired size for the ship
-        self.image = pygame.transform.scale(self.image, (60, 50))  # Increased width and height for visibility
+        # Use the shared ship image, scaled up for visibility
+        self.image = ai_game.assets.image('ship.bmp', (60, 50))
+        self.normal_image = self.image
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
         self.rect.midbottom = self.screen_rect.midbottom
 
-        # Store a float for the ship's exact horizontal position.
+        # Store a float for the ship's exact horizontal position, and where
+        # it was a step ago so frames between steps can be drawn smoothly.
         self.x = float(self.rect.x)
+        self.previous_x = self.x
 
         # Movement flags; start with a ship that's not moving.
         self.moving_right = False
@@ -32,10 +32,12 @@ class Ship(Sprite):
         """Center the ship on the screen."""
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.previous_x = self.x
 
     def update(self):
         """Update the ship's position based on movement flags."""
         # Update the ship's x value, not the rect.
+        self.previous_x = self.x
         if self.moving_right and self.rect.right < self.screen_rect.right:
             self.x += self.settings.ship_speed
         if self.moving_left and self.rect.left > 0:
@@ -44,9 +46,16 @@ class Ship(Sprite):
         # Update rect object from self.x.
         self.rect.x = self.x
 
-    def blitme(self):
-        """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
+    def blitme(self, behind=0.0, surface=None):
+        """Draw the ship to surface, the screen by default, and return the area drawn.
+
+        behind draws it that fraction of a step back towards its previous position.
+        """
+        surface = self.screen if surface is None else surface
+        if not behind:
+            return surface.blit(self.image, self.rect)
+        x = self.x - behind * (self.x - self.previous_x)
+        return surface.blit(self.image, (round(x), self.rect.y))
 
     def apply_powerup(self, powerup_type):
         """Apply the specified power-up to the ship."""
@@ -55,3 +64,10 @@ class Ship(Sprite):
         elif powerup_type == "size":
             self.image = pygame.transform.scale(self.image, (80, 65))  # Make the ship larger
         # Add additional power-up types as needed.
+
+    def remove_powerup(self, powerup_type):
+        """Undo a power-up applied by apply_powerup."""
+        if powerup_type == "speed":
+            self.settings.ship_speed /= 1.5
+        elif powerup_type == "size":
+            self.image = self.normal_image
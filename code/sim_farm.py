@@ -0,0 +1,196 @@
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from settings import Settings
+from bots import make_bot
+
+COLUMNS = ['reaction_time', 'accuracy', 'lives_lost', 'alien_speed']
+
+# File in the shard directory recording the session each shard was played from.
+MANIFEST = 'manifest.json'
+
+# Bot skill profiles; sessions cycle through them.
+PROFILES = {
+    'novice': ('tracker', {'aim_tolerance': 40, 'fire_chance': 0.05, 'reaction_frames': 30}),
+    'average': ('tracker', {'aim_tolerance': 20, 'fire_chance': 0.2, 'reaction_frames': 10}),
+    'expert': ('tracker', {'aim_tolerance': 8, 'fire_chance': 0.6, 'reaction_frames': 0}),
+    'erratic': ('random', {'fire_chance': 0.1, 'turn_chance': 0.05}),
+}
+
+
+def plan_sessions(count, frames, seed=0):
+    """Return one session description per session, each with its own seed, bot and settings."""
+    rng = random.Random(seed)
+    profiles = sorted(PROFILES)
+    sessions = []
+    for index in range(count):
+        sessions.append({
+            'index': index,
+            'seed': seed * 1000003 + index,
+            'profile': profiles[index % len(profiles)],
+            'frames': frames,
+            'settings': {
+                'initial_alien_speed': round(rng.uniform(0.5, 2.0), 3),
+                'bullets_allowed': rng.choice((3, 5, 8)),
+            },
+        })
+    return sessions
+
+
+def shard_path(shard_dir, index):
+    """Return the CSV file that holds one session's metrics."""
+    return os.path.join(shard_dir, f'session_{index:06d}.csv')
+
+
+def update_manifest(shard_dir, sessions):
+    """Record the sessions planned for shard_dir.
+
+    Raise ValueError if a finished shard was played from a different session,
+    as it is after a rerun with another --frames or --seed, rather than mix
+    the two runs' data.
+    """
+    path = os.path.join(shard_dir, MANIFEST)
+    recorded = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            recorded = json.load(f)
+    for session in sessions:
+        if (os.path.exists(shard_path(shard_dir, session['index']))
+                and recorded.get(str(session['index'])) != session):
+            raise ValueError(f"{shard_dir} holds shards from a run with different settings; "
+                             f"use another --shards directory or empty this one.")
+
+    recorded.update((str(session['index']), session) for session in sessions)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(recorded, f, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def run_session(session, shard_dir, service=None):
+    """Play one headless session and save its metrics shard. Return the shard's row count.
+
+    With service, the session gets its predictions from the difficulty
+    service on that socket instead of loading a model of its own.
+    """
+    # Imported here so each worker process sets up pygame for itself.
+    from alien_invasion import AlienInvasion
+
+    settings = Settings()
+    for name, value in session['settings'].items():
+        setattr(settings, name, value)
+    settings.initialize_dynamic_settings()
+    settings.difficulty_service = service
+
+    # Write to a temporary file and rename it when done, so an interrupted
+    # session never leaves a shard that looks finished.
+    final_path = shard_path(shard_dir, session['index'])
+    settings.metrics_path = final_path + '.tmp'
+    if os.path.exists(settings.metrics_path):
+        os.remove(settings.metrics_path)
+
+    bot_name, skill = PROFILES[session['profile']]
+    ai = AlienInvasion(settings=settings, headless=True, seed=session['seed'])
+    ai.run_headless(make_bot(bot_name, seed=session['seed'], **skill),
+                    max_frames=session['frames'])
+    ai.close()
+    rows = ai.metrics_sink.rows_written
+
+    os.replace(settings.metrics_path, final_path)
+    return rows
+
+
+def merge_shards(shard_dir, output_path):
+    """Merge every finished shard into one deduplicated training dataset."""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(shard_dir, 'session_*.csv'))):
+        df = pd.read_csv(path)
+        frames.append(df[COLUMNS].dropna().drop_duplicates())
+    if not frames:
+        return 0
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates()
+    merged.to_csv(output_path, index=False)
+    return len(merged)
+
+
+def start_service(address):
+    """Start a difficulty service on address, unless one is running; return it or None."""
+    from difficulty_service import DifficultyService
+    from model_watcher import load_difficulty_model
+
+    service = DifficultyService(load_difficulty_model(Settings())[0])
+    try:
+        service.serve(address)
+    except OSError:
+        service.close()
+        return None  # Already running; the sessions share it
+    return service
+
+
+def run_farm(sessions, shard_dir, output_path, workers=None, service=None):
+    """Run the sessions that have no shard yet across a process pool, then merge.
+
+    Raise ValueError if shard_dir holds shards of differently planned sessions.
+
+    With service, every session shares one difficulty service on that socket,
+    started here if it isn't already running.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    update_manifest(shard_dir, sessions)
+    pending = [s for s in sessions if not os.path.exists(shard_path(shard_dir, s['index']))]
+    print(f"{len(sessions) - len(pending)} sessions already done, {len(pending)} to run.")
+
+    own_service = start_service(service) if service and pending else None
+    rows = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_session, s, shard_dir, service) for s in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            rows += future.result()
+            elapsed = time.perf_counter() - start
+            print(f"\r{done}/{len(pending)} sessions, "
+                  f"{done / elapsed:.2f} sessions/s, {rows / elapsed:.0f} rows/s",
+                  end='', flush=True)
+    if pending:
+        print()
+    if own_service is not None:
+        own_service.close()
+        report = own_service.report()
+        print(f"Difficulty service: {report['requests']} predictions in {report['batches']} "
+              f"batches, mean batch {report['batch_mean']:.1f}, "
+              f"latency p95 {report['latency_ms_p95']:.2f} ms.")
+
+    merged_rows = merge_shards(shard_dir, output_path)
+    print(f"Merged {merged_rows} unique rows into {output_path}.")
+    return merged_rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Generate training data from many headless bot sessions in parallel.")
+    parser.add_argument('--sessions', type=int, default=32)
+    parser.add_argument('--frames', type=int, default=20000, help="Frames per session.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per core).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shards', default='sim_shards',
+                        help="Directory for per-session results; reused to resume a run.")
+    parser.add_argument('--output', default='simulated_metrics.csv')
+    parser.add_argument('--service', metavar='SOCKET', default=None,
+                        help="Share one difficulty service on SOCKET between the sessions, "
+                             "starting it if it isn't running.")
+    args = parser.parse_args()
+
+    try:
+        run_farm(plan_sessions(args.sessions, args.frames, args.seed),
+                 args.shards, args.output, workers=args.workers, service=args.service)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,54 @@
+import argparse
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from bots import BOTS, make_bot
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Play Alien Invasion headlessly with a bot, as fast as possible.")
+    parser.add_argument('--bot', choices=sorted(BOTS), default='tracker')
+    parser.add_argument('--frames', type=int, default=None, help="Stop after this many frames.")
+    parser.add_argument('--episodes', type=int, default=None, help="Stop after this many games.")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--metrics', default='simulated_metrics.csv',
+                        help="CSV file, or binary store ending in .bin, that receives "
+                             "the simulated player metrics.")
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help="Time each phase of every frame and write the results to "
+                             "PATH (.json or .csv).")
+    parser.add_argument('--record', metavar='PATH', default=None,
+                        help="Record the session's inputs to PATH for replay.py.")
+    parser.add_argument('--service', metavar='SOCKET', default=None,
+                        help="Get predictions from the difficulty_service.py listening on SOCKET.")
+    args = parser.parse_args()
+
+    if args.frames is None and args.episodes is None:
+        args.frames = 10000
+
+    settings = Settings()
+    settings.metrics_path = args.metrics
+    if args.metrics.endswith('.bin'):
+        settings.metrics_format = 'binary'
+    if args.profile:
+        settings.profile_path = args.profile
+    settings.record_path = args.record
+    settings.difficulty_service = args.service
+
+    ai = AlienInvasion(settings=settings, headless=True, seed=args.seed)
+    if args.profile:
+        ai.profiler = ai.frame_profiler
+    result = ai.run_headless(make_bot(args.bot, seed=args.seed),
+                             max_frames=args.frames, max_episodes=args.episodes)
+    ai.close()
+
+    print(f"{result['frames']} frames, {result['episodes']} games in "
+          f"{result['seconds']:.2f}s ({result['fps']:.0f} frames per second)")
+    if result['scores']:
+        print(f"Mean score: {sum(result['scores']) / len(result['scores']):.0f}")
+    recent = ai.stats.rolling_report()
+    if recent['reactions']:
+        print(f"Recent reaction times: mean {recent['reaction_mean']:.3f}s, "
+              f"p50 {recent['reaction_p50']:.3f}s, p90 {recent['reaction_p90']:.3f}s; "
+              f"recent accuracy {recent['accuracy']:.2f}")
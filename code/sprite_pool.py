@@ -0,0 +1,75 @@
+from pygame.sprite import Sprite
+
+
+class PooledSprite(Sprite):
+    """A sprite that goes back to its pool once it has left every group."""
+
+    pool = None
+
+    def reset(self):
+        """Put the sprite back in its starting state; subclasses override this."""
+
+    def kill(self):
+        """Remove the sprite from all groups and return it to its pool."""
+        super().kill()
+        self._release()
+
+    def remove_internal(self, group):
+        """Return the sprite to its pool when group.remove or group.empty drops it."""
+        super().remove_internal(group)
+        if not self.alive():
+            self._release()
+
+    def _release(self):
+        """Hand the sprite back to its pool, if it came from one."""
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    """A class to recycle sprites so none are built during play."""
+
+    def __init__(self, factory, size=0):
+        """Build size sprites up front with factory, which takes no arguments."""
+        self.factory = factory
+        self._free = []
+        self.created = 0
+        self.reused = 0
+        self.reserve(size)
+
+    def __len__(self):
+        """Return the number of sprites waiting to be reused."""
+        return len(self._free)
+
+    def reserve(self, size):
+        """Make sure at least size sprites are waiting to be reused."""
+        while len(self._free) < size:
+            self._free.append(self._create())
+
+    def acquire(self):
+        """Return a sprite in its starting state, reusing a free one if there is one."""
+        if not self._free:
+            sprite = self._create()
+        else:
+            sprite = self._free.pop()
+            self.reused += 1
+        # Fresh sprites are reset too, so sprites built up front can leave
+        # anything random to reset() and not draw from the game's generator early.
+        sprite.reset()
+        sprite._pooled = False
+        return sprite
+
+    def release(self, sprite):
+        """Take back a sprite that is no longer in any group."""
+        # kill() and group.remove() can both report the same sprite.
+        if not sprite._pooled:
+            sprite._pooled = True
+            self._free.append(sprite)
+
+    def _create(self):
+        """Build a new sprite that belongs to this pool."""
+        sprite = self.factory()
+        sprite.pool = self
+        sprite._pooled = True
+        self.created += 1
+        return sprite
@@ -1,28 +1,138 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-import joblib
-
-# Load the data
-df = pd.read_csv('player_metrics.csv')
-
-# Drop rows with missing values
-df.dropna(inplace=True)
-
-# Ensure these columns exist in your DataFrame
-if all(col in df.columns for col in ['reaction_time', 'accuracy', 'lives_lost', 'alien_speed']):
-    X = df[['reaction_time', 'accuracy', 'lives_lost']]  # Features
-    y = df['alien_speed']  # Target variable
-
-    # Split the data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Train the model
-    model = RandomForestRegressor()
-    model.fit(X_train, y_train)
-
-    # Save the model
-    joblib.dump(model, 'difficulty_model.pkl')
-else:
-    print("Required columns are missing from the CSV file.")
-
+import argparse
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+import joblib
+
+from metrics_store import load_metrics
+from compiled_model import (LookupGrid, compile_model, save_compiled_model,
+                            check_compiled_model, default_grid_axes)
+from model_selection import select_model, save_report, print_report
+
+FEATURES = ['reaction_time', 'accuracy', 'lives_lost']
+TARGET = 'alien_speed'
+
+
+def load_training_data(metrics_path, sessions=None):
+    """Return the features and target of a metrics file, or (None, None) if columns are missing."""
+    # Load the data
+    df = load_metrics(metrics_path, sessions)
+
+    # Drop rows with missing values
+    df.dropna(inplace=True)
+
+    # Ensure these columns exist in your DataFrame
+    if not all(col in df.columns for col in FEATURES + [TARGET]):
+        print("Required columns are missing from the metrics file.")
+        return None, None
+
+    X = df[FEATURES]  # Features
+    y = df[TARGET]  # Target variable
+    return X, y
+
+
+def train(metrics_path, model_path, sessions=None):
+    """Train the difficulty model on a metrics CSV or .bin store and save it.
+
+    Return the model and test rows. sessions picks sessions out of a .bin store.
+    """
+    X, y = load_training_data(metrics_path, sessions)
+    if X is None:
+        return None, None
+
+    # Split the data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Train the model
+    model = RandomForestRegressor()
+    model.fit(X_train, y_train)
+
+    # Save the model
+    joblib.dump(model, model_path)
+    return model, X_test
+
+
+def train_selected(metrics_path, model_path, sessions=None, budget_us=250.0, workers=None):
+    """Pick the best model within the latency budget, save it and its report.
+
+    Return the model and test rows, like train.
+    """
+    X, y = load_training_data(metrics_path, sessions)
+    if X is None:
+        return None, None
+    model, report, X_test = select_model(X, y, budget_us, workers)
+    print_report(report)
+    joblib.dump(model, model_path)
+    print(f"Report written to {save_report(report, model_path)}.")
+    return model, X_test
+
+
+def export_compiled(model, compiled_path, X_check, grid=False, tolerance=1e-9,
+                    grid_tolerance=0.1):
+    """Compile the model to NumPy arrays, check it against the original and save it."""
+    # Check on the held-out rows plus random points across the feature ranges.
+    axes = default_grid_axes()
+    rng = np.random.default_rng(0)
+    random_rows = np.column_stack([rng.uniform(axis[0], axis[-1], 2000) for axis in axes])
+    X_check = np.vstack([np.asarray(X_check, dtype=np.float64).reshape(-1, len(FEATURES)),
+                         random_rows])
+
+    compiled = compile_model(model)
+    error = check_compiled_model(model, compiled, X_check, tolerance)
+    print(f"Compiled {compiled.kind}: max difference {error:.2e} over {len(X_check)} rows.")
+
+    if grid:
+        compiled = LookupGrid.from_model(compiled, axes)
+        error = check_compiled_model(model, compiled, X_check, grid_tolerance, metric='mean')
+        print(f"Lookup grid: mean difference {error:.4f} over {len(X_check)} rows.")
+
+    save_compiled_model(compiled, compiled_path)
+    return compiled
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the difficulty model.")
+    parser.add_argument('--metrics', default='player_metrics.csv',
+                        help="Metrics CSV, or a binary store ending in .bin.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=None,
+                        help="Sessions of a .bin store to train on (default: all).")
+    parser.add_argument('--window', type=int, default=None, metavar='FRAMES',
+                        help="First summarize the metrics into one row per window of "
+                             "this many frames with feature_pipeline.py, and train on that.")
+    parser.add_argument('--matrix', default='training_matrix.csv',
+                        help="Where --window writes the summarized training matrix.")
+    parser.add_argument('--model', default='difficulty_model.pkl')
+    parser.add_argument('--compiled', default='difficulty_model_compiled',
+                        help="Directory for the compiled NumPy model.")
+    parser.add_argument('--grid', action='store_true',
+                        help="Export an interpolated lookup grid instead of the forest.")
+    parser.add_argument('--export-only', action='store_true',
+                        help="Compile the existing model file without retraining.")
+    parser.add_argument('--select', action='store_true',
+                        help="Fit a grid of candidate models in parallel and keep the most "
+                             "accurate one within --budget-us (see model_selection.py).")
+    parser.add_argument('--budget-us', type=float, default=250.0,
+                        help="Latency budget for one compiled prediction, in microseconds.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --select (default: one per core; "
+                             "0 fits in-process).")
+    args = parser.parse_args()
+
+    if args.export_only:
+        model, X_test = joblib.load(args.model), np.empty((0, len(FEATURES)))
+    else:
+        metrics = args.metrics
+        if args.window:
+            from feature_pipeline import build_training_matrix
+            stats = build_training_matrix(args.metrics, args.matrix, args.window)
+            print(f"Summarized {stats['rows_in']} rows into {stats['windows']} windows.")
+            metrics = args.matrix
+        if args.select:
+            model, X_test = train_selected(metrics, args.model, args.sessions,
+                                           args.budget_us, args.workers)
+        else:
+            model, X_test = train(metrics, args.model, args.sessions)
+
+    if model is not None:
+        export_compiled(model, args.compiled, X_test, grid=args.grid)